@@ -8,10 +8,15 @@ This script:
 4. Pushes everything to PostgreSQL, recreating tables on each run
 """
 
+import hashlib
+import io
 import os
 import sys
 import uuid
-from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from datetime import MAXYEAR, MINYEAR, date
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 
@@ -19,6 +24,8 @@ import psycopg2
 import psycopg2.extras
 
 from _utils import (
+    TokenBucket,
+    create_session,
     fetch_all_records,
     log,
     setup_environment,
@@ -31,8 +38,25 @@ from _utils import (
 
 SCRIPT_NAME = "01b_fetch_airtable_to_sql"
 
+# Airtable allows 5 requests per second per base
+AIRTABLE_RATE_LIMIT = 5
+AIRTABLE_RETRIES = 5
+# Throttled (429) and transient server errors are retried with exponential
+# backoff, honouring Retry-After
+AIRTABLE_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Tables with at least this many rows are loaded through COPY instead of INSERT
+COPY_MIN_ROWS = 500
+
+# Session settings for the bulk load
+DB_SESSION_OPTIONS = "-c synchronous_commit=off -c work_mem=64MB"
+
+# Escapes for PostgreSQL's COPY text format
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
 # UUID namespace for deterministic ID generation (custom namespace for CRAF'd)
 CRAFD_UUID_NAMESPACE = uuid.UUID("a1b2c3d4-e5f6-7890-abcd-ef1234567890")
+_NAMESPACE_BYTES = CRAFD_UUID_NAMESPACE.bytes
 
 # Field specs (mirrors 01_fetch_airtable.py)
 FIELDS = {
@@ -90,6 +114,29 @@ FIELDS = {
     ],
 }
 
+# Organization columns copied straight from Airtable, in table order before and
+# after the computed type/country/budget columns
+ORG_LEADING_FIELDS = itemgetter(
+    "org_key",
+    "Org Full Name",
+    "Org Short Name",
+    "Org Website",
+    "Org Description",
+)
+ORG_TRAILING_FIELDS = itemgetter(
+    "Budget Source",
+    "Link to Budget Source",
+    "HDX Org Key",
+    "IATI Org Key",
+    "Org MPTFO Name",
+    "Org MPTFO URL [Formula]",
+    "Org Transparency Portal",
+    "Link to Data Products Overview",
+    "Funding Type",
+)
+# Airtable omits empty fields, so missing ones are pre-filled with None
+ORG_FIELD_DEFAULTS = dict.fromkeys(FIELDS["organizations"])
+
 
 # ---------------------------------------------------------------------------
 # UUID helpers
@@ -100,9 +147,14 @@ def make_uuid(seed: str) -> str:
     """Generate a deterministic UUID v5 from a seed string.
 
     Using a fixed namespace ensures the same Airtable record ID always
-    produces the same UUID, making re-runs idempotent.
+    produces the same UUID, making re-runs idempotent. Equivalent to
+    str(uuid.uuid5(CRAFD_UUID_NAMESPACE, seed)) without building UUID objects.
     """
-    return str(uuid.uuid5(CRAFD_UUID_NAMESPACE, seed))
+    digest = bytearray(hashlib.sha1(_NAMESPACE_BYTES + seed.encode("utf-8"), usedforsecurity=False).digest()[:16])
+    digest[6] = (digest[6] & 0x0F) | 0x50  # version 5
+    digest[8] = (digest[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = digest.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
 
 
 def make_junction_uuid(left_id: str, right_id: str) -> str:
@@ -116,7 +168,11 @@ def make_junction_uuid(left_id: str, right_id: str) -> str:
 
 
 def get_db_connection():
-    """Create a PostgreSQL connection using env vars."""
+    """Create a PostgreSQL connection using env vars.
+
+    The session skips the WAL flush wait at commit: a crash mid-load is
+    recovered by simply re-running this idempotent script.
+    """
     return psycopg2.connect(
         host=os.getenv("AZURE_POSTGRES_HOST"),
         port=int(os.getenv("AZURE_POSTGRES_PORT", "5432")),
@@ -124,37 +180,87 @@ def get_db_connection():
         user=os.getenv("AZURE_POSTGRES_USER"),
         password=os.getenv("AZURE_POSTGRES_PASSWORD"),
         sslmode="require",
+        keepalives=1,
+        keepalives_idle=30,
+        keepalives_interval=10,
+        options=DB_SESSION_OPTIONS,
     )
 
 
-def run_sql_file(conn, filepath: Path):
-    """Execute a .sql file against the connection."""
-    sql = filepath.read_text(encoding="utf-8")
-    with conn.cursor() as cur:
-        cur.execute(sql)
-    conn.commit()
-    log(SCRIPT_NAME, f"  Executed {filepath.name}")
-
-
 def apply_schema(conn, schema_dir: Path):
-    """Drop and recreate all tables from the SQL migration files."""
+    """Drop and recreate all tables from the SQL migration files.
+
+    The files are concatenated in name order and sent as one multi-statement
+    execute, committed on its own before any data is loaded.
+    """
     log(SCRIPT_NAME, "Applying schema (drop + create) …")
     sql_files = sorted(schema_dir.glob("*.sql"))
+    sql = "\n".join(sql_file.read_text(encoding="utf-8") for sql_file in sql_files)
+    with conn.cursor() as cur:
+        cur.execute(sql)
+    conn.commit()
     for sql_file in sql_files:
-        run_sql_file(conn, sql_file)
+        log(SCRIPT_NAME, f"  Executed {sql_file.name}")
     log(SCRIPT_NAME, "Schema applied successfully")
 
 
+def copy_value(value) -> str:
+    """Render a value as a field of PostgreSQL's COPY text format.
+
+    The schema has no array or JSON columns, so lists and dicts are rejected,
+    just as the execute_values path fails on them, rather than stored as reprs.
+    """
+    if isinstance(value, (list, dict)):
+        raise TypeError(f"Cannot COPY {type(value).__name__} value into a scalar column: {value!r}")
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
+
+
+def copy_upsert(conn, table: str, columns: List[str], rows: List[tuple], conflict_col: str = "id"):
+    """Load rows through COPY into a temp table, then insert with ON CONFLICT DO NOTHING.
+
+    Runs in the caller's transaction; nothing is committed here.
+    """
+    cols = ", ".join(columns)
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(map(copy_value, row)))
+        buf.write("\n")
+    buf.seek(0)
+
+    with conn.cursor() as cur:
+        cur.execute(
+            f"CREATE TEMP TABLE tmp_{table} (LIKE funding_compass.{table} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        cur.copy_expert(f"COPY tmp_{table} ({cols}) FROM STDIN WITH (FORMAT text)", buf)
+        cur.execute(
+            f"INSERT INTO funding_compass.{table} ({cols}) SELECT {cols} FROM tmp_{table} "
+            f"ON CONFLICT ({conflict_col}) DO NOTHING"
+        )
+        cur.execute(f"DROP TABLE tmp_{table}")
+    log(SCRIPT_NAME, f"  {table}: copied {len(rows)} rows")
+
+
 def bulk_upsert(conn, table: str, columns: List[str], rows: List[tuple], conflict_col: str = "id"):
-    """Insert rows with ON CONFLICT DO NOTHING (idempotent)."""
+    """Insert rows with ON CONFLICT DO NOTHING (idempotent), without committing.
+
+    Large tables go through copy_upsert; small lookup tables use a multi-row INSERT.
+    """
     if not rows:
         return
+    if len(rows) >= COPY_MIN_ROWS:
+        copy_upsert(conn, table, columns, rows, conflict_col)
+        return
     cols = ", ".join(columns)
-    placeholders = ", ".join(["%s"] * len(columns))
-    sql = f"INSERT INTO funding_compass.{table} ({cols}) VALUES ({placeholders}) ON CONFLICT ({conflict_col}) DO NOTHING"
+    sql = f"INSERT INTO funding_compass.{table} ({cols}) VALUES %s ON CONFLICT ({conflict_col}) DO NOTHING"
     with conn.cursor() as cur:
-        psycopg2.extras.execute_batch(cur, sql, rows, page_size=500)
-    conn.commit()
+        # one multi-row INSERT per page instead of one statement per row
+        psycopg2.extras.execute_values(cur, sql, rows, page_size=1000)
     log(SCRIPT_NAME, f"  {table}: upserted {len(rows)} rows")
 
 
@@ -163,19 +269,46 @@ def bulk_upsert(conn, table: str, columns: List[str], rows: List[tuple], conflic
 # ---------------------------------------------------------------------------
 
 
-def get_field(record: Dict, field_name: str, default=None):
-    """Safely extract a field from an Airtable record."""
-    return record.get("fields", {}).get(field_name, default)
-
-
 def safe_float(value) -> Optional[float]:
-    """Try to parse a value as float, returning None on failure."""
-    if value is None:
-        return None
-    try:
+    """Try to parse a value as float, returning None on failure.
+
+    Numbers and numeric-looking strings are handled up front so the common
+    cases never raise.
+    """
+    if isinstance(value, (int, float)):
         return float(value)
-    except (ValueError, TypeError):
+    if isinstance(value, str):
+        value = value.strip()
+        if value and (value[0].isdigit() or value[0] in "+-."):
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def parse_year(value) -> Optional[date]:
+    """Parse a year number or digit string as January 1st of that year."""
+    if isinstance(value, str):
+        value = value.strip()
+        if not value.isdecimal():
+            return None
+        year = int(value)
+    elif isinstance(value, int) and not isinstance(value, bool):
+        year = value
+    elif isinstance(value, float) and value.is_integer():
+        year = int(value)
+    else:
         return None
+    if MINYEAR <= year <= MAXYEAR:
+        return date(year, 1, 1)
+    return None
+
+
+@lru_cache(maxsize=None)
+def _norm(name: Optional[str]) -> str:
+    """Strip and intern a lookup name, so repeated names share one string."""
+    return sys.intern(name.strip()) if name else ""
 
 
 def extract_countries(
@@ -191,15 +324,17 @@ def extract_countries(
     names: Set[str] = set()
 
     for rec in agencies:
-        cn = get_field(rec, "Country Name")
+        fields = rec.get("fields") or {}
+        cn = fields.get("Country Name")
         if cn:
-            names.add(cn.strip())
+            names.add(_norm(cn))
 
     for rec in organizations:
-        hq = get_field(rec, "Org HQ Country") or []
+        fields = rec.get("fields") or {}
+        hq = fields.get("Org HQ Country") or []
         for c in (hq if isinstance(hq, list) else [hq]):
             if c:
-                names.add(c.strip())
+                names.add(_norm(c))
 
     return {name: make_uuid(f"country::{name}") for name in sorted(names) if name}
 
@@ -210,9 +345,10 @@ def extract_organization_types(
     """Collect unique org type names → {name: uuid}."""
     names: Set[str] = set()
     for rec in organizations:
-        ot = get_field(rec, "Org Type")
+        fields = rec.get("fields") or {}
+        ot = fields.get("Org Type")
         if ot:
-            names.add(ot.strip())
+            names.add(_norm(ot))
     return {name: make_uuid(f"org_type::{name}") for name in sorted(names) if name}
 
 
@@ -222,10 +358,11 @@ def extract_investment_types(
     """Collect unique investment type names → {name: uuid}."""
     names: Set[str] = set()
     for rec in themes:
-        types = get_field(rec, "Investment Type") or []
+        fields = rec.get("fields") or {}
+        types = fields.get("Investment Type") or []
         for t in (types if isinstance(types, list) else [types]):
             if t:
-                names.add(t.strip())
+                names.add(_norm(t))
     return {name: make_uuid(f"inv_type::{name}") for name in sorted(names) if name}
 
 
@@ -240,9 +377,10 @@ def extract_donors(
     """
     names: Set[str] = set()
     for rec in agencies:
-        cn = get_field(rec, "Country Name")
+        fields = rec.get("fields") or {}
+        cn = fields.get("Country Name")
         if cn:
-            names.add(cn.strip())
+            names.add(_norm(cn))
     return {name: make_uuid(f"donor::{name}") for name in sorted(names) if name}
 
 
@@ -255,13 +393,14 @@ def build_agencies_rows(
     rows = []
     at_to_uuid: Dict[str, str] = {}
     for rec in agencies:
+        fields = rec.get("fields") or {}
         at_id = rec["id"]
         uid = make_uuid(f"agency::{at_id}")
         at_to_uuid[at_id] = uid
 
-        name = get_field(rec, "Agency/Department Name") or ""
-        website = get_field(rec, "Agency Website") or get_field(rec, "Agency Data Portal")
-        country_name = (get_field(rec, "Country Name") or "").strip()
+        name = fields.get("Agency/Department Name") or ""
+        website = fields.get("Agency Website") or fields.get("Agency Data Portal")
+        country_name = _norm(fields.get("Country Name"))
         donor_id = donor_map.get(country_name)
         country_id = country_map.get(country_name)
 
@@ -272,105 +411,106 @@ def build_agencies_rows(
 def build_themes_rows(
     themes: List[Dict],
     type_map: Dict[str, str],
-) -> Tuple[List[tuple], Dict[str, str], Dict[str, str]]:
+) -> Tuple[List[tuple], Dict[str, str], Dict[str, str], Dict[str, List[str]]]:
     """Build theme rows + mappings.
 
     Returns:
-        (rows, airtable_id→uuid, theme_text_name→uuid)
+        (rows, airtable_id→uuid, theme_text_name→uuid,
+         airtable_id→linked project ids)
     """
     rows = []
     at_to_uuid: Dict[str, str] = {}
     name_to_uuid: Dict[str, str] = {}
+    linked_projects: Dict[str, List[str]] = {}
     for rec in themes:
+        fields = rec.get("fields") or {}
         at_id = rec["id"]
         uid = make_uuid(f"theme::{at_id}")
         at_to_uuid[at_id] = uid
 
-        theme_name = get_field(rec, "Investment Themes [Text Key]") or ""
-        theme_key = get_field(rec, "theme_key") or ""
-        description = get_field(rec, "theme_description") or ""
+        theme_name = fields.get("Investment Themes [Text Key]") or ""
+        theme_key = fields.get("theme_key") or ""
+        description = fields.get("theme_description") or ""
 
         # Link to first investment type
-        inv_types = get_field(rec, "Investment Type") or []
-        first_type = inv_types[0].strip() if isinstance(inv_types, list) and inv_types else (inv_types.strip() if isinstance(inv_types, str) else "")
+        inv_types = fields.get("Investment Type") or []
+        first_type = _norm(inv_types[0]) if isinstance(inv_types, list) and inv_types else (_norm(inv_types) if isinstance(inv_types, str) else "")
         type_id = type_map.get(first_type)
 
         rows.append((uid, theme_key, theme_name, description, type_id))
         if theme_name:
-            name_to_uuid[theme_name.strip()] = uid
+            name_to_uuid[_norm(theme_name)] = uid
+        linked_projects[at_id] = fields.get("Data Ecosystem Projects") or []
 
-    return rows, at_to_uuid, name_to_uuid
+    return rows, at_to_uuid, name_to_uuid, linked_projects
 
 
 def build_organizations_rows(
     organizations: List[Dict],
     org_type_map: Dict[str, str],
     country_map: Dict[str, str],
-) -> Tuple[List[tuple], Dict[str, str]]:
-    """Build organization rows + airtable_id → uuid mapping."""
+) -> Tuple[List[tuple], Dict[str, str], Dict[str, Tuple[List[str], List[str]]]]:
+    """Build organization rows + airtable_id → uuid mapping.
+
+    Also returns airtable_id → (donor agency ids, linked project ids) so the
+    junction builders need not walk the raw records again.
+    """
     rows = []
     at_to_uuid: Dict[str, str] = {}
+    links: Dict[str, Tuple[List[str], List[str]]] = {}
     for rec in organizations:
+        fields = {**ORG_FIELD_DEFAULTS, **(rec.get("fields") or {})}
         at_id = rec["id"]
         uid = make_uuid(f"org::{at_id}")
         at_to_uuid[at_id] = uid
 
-        org_type_name = (get_field(rec, "Org Type") or "").strip()
+        org_type_name = _norm(fields.get("Org Type"))
         org_type_id = org_type_map.get(org_type_name)
 
-        hq_countries = get_field(rec, "Org HQ Country") or []
-        first_country = hq_countries[0].strip() if isinstance(hq_countries, list) and hq_countries else ""
+        hq_countries = fields.get("Org HQ Country") or []
+        first_country = _norm(hq_countries[0]) if isinstance(hq_countries, list) and hq_countries else ""
         country_id = country_map.get(first_country)
 
-        est_budget = get_field(rec, "Est. Org Budget")
-        programme_budget = get_field(rec, "Org Programme Budget")
+        est_budget = fields.get("Est. Org Budget")
+        programme_budget = fields.get("Org Programme Budget")
 
-        last_updated_raw = get_field(rec, "Last Updated")
-        last_updated = None
-        if last_updated_raw:
-            try:
-                year = int(last_updated_raw)
-                last_updated = date(year, 1, 1)
-            except (ValueError, TypeError):
-                pass
+        last_updated = parse_year(fields.get("Last Updated"))
 
         rows.append((
             uid,
-            get_field(rec, "org_key"),
-            get_field(rec, "Org Full Name"),
-            get_field(rec, "Org Short Name"),
-            get_field(rec, "Org Website"),
-            get_field(rec, "Org Description"),
+            *ORG_LEADING_FIELDS(fields),
             org_type_id,
             country_id,
             safe_float(est_budget),
             safe_float(programme_budget),
-            get_field(rec, "Budget Source"),
-            get_field(rec, "Link to Budget Source"),
-            get_field(rec, "HDX Org Key"),
-            get_field(rec, "IATI Org Key"),
-            get_field(rec, "Org MPTFO Name"),
-            get_field(rec, "Org MPTFO URL [Formula]"),
-            get_field(rec, "Org Transparency Portal"),
-            get_field(rec, "Link to Data Products Overview"),
-            get_field(rec, "Funding Type"),
+            *ORG_TRAILING_FIELDS(fields),
             last_updated,
         ))
-    return rows, at_to_uuid
+        links[at_id] = (
+            fields.get("Org Donor Agencies") or [],
+            fields.get("Provided Data Ecosystem Projects") or [],
+        )
+    return rows, at_to_uuid, links
 
 
 def build_projects_rows(
     projects: List[Dict],
-) -> Tuple[List[tuple], Dict[str, str]]:
-    """Build project rows + airtable_id → uuid mapping."""
+) -> Tuple[List[tuple], Dict[str, str], Dict[str, Tuple[List[str], List[str]]]]:
+    """Build project rows + airtable_id → uuid mapping.
+
+    Also returns airtable_id → (donor agency ids, stripped investment theme
+    names) for the junction builders.
+    """
     rows = []
     at_to_uuid: Dict[str, str] = {}
+    links: Dict[str, Tuple[List[str], List[str]]] = {}
     for rec in projects:
+        fields = rec.get("fields") or {}
         at_id = rec["id"]
         uid = make_uuid(f"project::{at_id}")
         at_to_uuid[at_id] = uid
 
-        hdx_raw = get_field(rec, "HDX_SOHD")
+        hdx_raw = fields.get("HDX_SOHD")
         hdx_sohd = None
         if hdx_raw is not None:
             if isinstance(hdx_raw, bool):
@@ -380,13 +520,20 @@ def build_projects_rows(
 
         rows.append((
             uid,
-            get_field(rec, "product_key"),
-            get_field(rec, "Project/Product Name") or "",
-            get_field(rec, "Project Description"),
-            get_field(rec, "Project Website"),
+            fields.get("product_key"),
+            fields.get("Project/Product Name") or "",
+            fields.get("Project Description"),
+            fields.get("Project Website"),
             hdx_sohd,
         ))
-    return rows, at_to_uuid
+        theme_names = fields.get("Investment Theme(s)") or []
+        if not isinstance(theme_names, list):
+            theme_names = [theme_names]
+        links[at_id] = (
+            fields.get("Project Donor Agencies") or [],
+            [_norm(tname) for tname in theme_names if tname],
+        )
+    return rows, at_to_uuid, links
 
 
 # ---------------------------------------------------------------------------
@@ -395,86 +542,71 @@ def build_projects_rows(
 
 
 def build_agency_project_funding(
-    projects: List[Dict],
+    project_links: Dict[str, Tuple[List[str], List[str]]],
     agency_at_map: Dict[str, str],
     project_at_map: Dict[str, str],
 ) -> List[tuple]:
     """agency_project_funding from projects' `Project Donor Agencies`."""
-    rows = []
-    seen: Set[Tuple[str, str]] = set()
-    for rec in projects:
-        proj_at_id = rec["id"]
-        proj_uuid = project_at_map.get(proj_at_id)
+    pairs: Dict[Tuple[str, str], tuple] = {}
+    agency_get = agency_at_map.get
+    project_get = project_at_map.get
+    for proj_at_id, (donor_agencies, _) in project_links.items():
+        proj_uuid = project_get(proj_at_id)
         if not proj_uuid:
             continue
-        donor_agencies = get_field(rec, "Project Donor Agencies") or []
         for agency_at_id in donor_agencies:
-            agency_uuid = agency_at_map.get(agency_at_id)
-            if agency_uuid and (agency_uuid, proj_uuid) not in seen:
-                seen.add((agency_uuid, proj_uuid))
-                rows.append((
-                    make_junction_uuid(agency_at_id, proj_at_id),
-                    agency_uuid,
-                    proj_uuid,
-                ))
-    return rows
+            agency_uuid = agency_get(agency_at_id)
+            pair = (agency_uuid, proj_uuid)
+            if agency_uuid and pair not in pairs:
+                pairs[pair] = (make_junction_uuid(agency_at_id, proj_at_id), *pair)
+    return list(pairs.values())
 
 
 def build_agency_organization_funding(
-    organizations: List[Dict],
+    org_links: Dict[str, Tuple[List[str], List[str]]],
     agency_at_map: Dict[str, str],
     org_at_map: Dict[str, str],
 ) -> List[tuple]:
     """agency_organization_funding from orgs' `Org Donor Agencies`."""
-    rows = []
-    seen: Set[Tuple[str, str]] = set()
-    for rec in organizations:
-        org_at_id = rec["id"]
-        org_uuid = org_at_map.get(org_at_id)
+    pairs: Dict[Tuple[str, str], tuple] = {}
+    agency_get = agency_at_map.get
+    org_get = org_at_map.get
+    for org_at_id, (donor_agencies, _) in org_links.items():
+        org_uuid = org_get(org_at_id)
         if not org_uuid:
             continue
-        donor_agencies = get_field(rec, "Org Donor Agencies") or []
         for agency_at_id in donor_agencies:
-            agency_uuid = agency_at_map.get(agency_at_id)
-            if agency_uuid and (agency_uuid, org_uuid) not in seen:
-                seen.add((agency_uuid, org_uuid))
-                rows.append((
-                    make_junction_uuid(agency_at_id, org_at_id),
-                    agency_uuid,
-                    org_uuid,
-                ))
-    return rows
+            agency_uuid = agency_get(agency_at_id)
+            pair = (agency_uuid, org_uuid)
+            if agency_uuid and pair not in pairs:
+                pairs[pair] = (make_junction_uuid(agency_at_id, org_at_id), *pair)
+    return list(pairs.values())
 
 
 def build_organization_project(
-    organizations: List[Dict],
+    org_links: Dict[str, Tuple[List[str], List[str]]],
     org_at_map: Dict[str, str],
     project_at_map: Dict[str, str],
 ) -> List[tuple]:
     """organization_project from orgs' `Provided Data Ecosystem Projects`."""
-    rows = []
-    seen: Set[Tuple[str, str]] = set()
-    for rec in organizations:
-        org_at_id = rec["id"]
-        org_uuid = org_at_map.get(org_at_id)
+    pairs: Dict[Tuple[str, str], tuple] = {}
+    org_get = org_at_map.get
+    project_get = project_at_map.get
+    for org_at_id, (_, linked_projects) in org_links.items():
+        org_uuid = org_get(org_at_id)
         if not org_uuid:
             continue
-        linked_projects = get_field(rec, "Provided Data Ecosystem Projects") or []
         for proj_at_id in linked_projects:
-            proj_uuid = project_at_map.get(proj_at_id)
-            if proj_uuid and (org_uuid, proj_uuid) not in seen:
-                seen.add((org_uuid, proj_uuid))
-                rows.append((
-                    make_junction_uuid(org_at_id, proj_at_id),
-                    org_uuid,
-                    proj_uuid,
-                ))
-    return rows
+            proj_uuid = project_get(proj_at_id)
+            pair = (org_uuid, proj_uuid)
+            if proj_uuid and pair not in pairs:
+                pairs[pair] = (make_junction_uuid(org_at_id, proj_at_id), *pair)
+    return list(pairs.values())
 
 
 def build_project_themes(
-    themes: List[Dict],
-    projects: List[Dict],
+    theme_projects: Dict[str, List[str]],
+    project_links: Dict[str, Tuple[List[str], List[str]]],
     theme_at_map: Dict[str, str],
     theme_name_map: Dict[str, str],
     project_at_map: Dict[str, str],
@@ -484,46 +616,34 @@ def build_project_themes(
     1. Theme records' `Data Ecosystem Projects` (Airtable linked IDs)
     2. Project records' `Investment Theme(s)` (text names → match to theme)
     """
-    rows = []
-    seen: Set[Tuple[str, str]] = set()
+    pairs: Dict[Tuple[str, str], tuple] = {}
+    project_get = project_at_map.get
+    theme_get = theme_at_map.get
+    theme_name_get = theme_name_map.get
 
     # Source 1: theme → projects link
-    for rec in themes:
-        theme_at_id = rec["id"]
-        theme_uuid = theme_at_map.get(theme_at_id)
+    for theme_at_id, linked in theme_projects.items():
+        theme_uuid = theme_get(theme_at_id)
         if not theme_uuid:
             continue
-        linked = get_field(rec, "Data Ecosystem Projects") or []
         for proj_at_id in linked:
-            proj_uuid = project_at_map.get(proj_at_id)
-            if proj_uuid and (proj_uuid, theme_uuid) not in seen:
-                seen.add((proj_uuid, theme_uuid))
-                rows.append((
-                    make_junction_uuid(proj_at_id, theme_at_id),
-                    proj_uuid,
-                    theme_uuid,
-                ))
+            proj_uuid = project_get(proj_at_id)
+            pair = (proj_uuid, theme_uuid)
+            if proj_uuid and pair not in pairs:
+                pairs[pair] = (make_junction_uuid(proj_at_id, theme_at_id), *pair)
 
     # Source 2: project → theme name matching
-    for rec in projects:
-        proj_at_id = rec["id"]
-        proj_uuid = project_at_map.get(proj_at_id)
+    for proj_at_id, (_, theme_names) in project_links.items():
+        proj_uuid = project_get(proj_at_id)
         if not proj_uuid:
             continue
-        theme_names = get_field(rec, "Investment Theme(s)") or []
-        for tname in (theme_names if isinstance(theme_names, list) else [theme_names]):
-            if not tname:
-                continue
-            theme_uuid = theme_name_map.get(tname.strip())
-            if theme_uuid and (proj_uuid, theme_uuid) not in seen:
-                seen.add((proj_uuid, theme_uuid))
-                rows.append((
-                    make_junction_uuid(proj_at_id, f"theme_name::{tname.strip()}"),
-                    proj_uuid,
-                    theme_uuid,
-                ))
-
-    return rows
+        for tname in theme_names:
+            theme_uuid = theme_name_get(tname)
+            pair = (proj_uuid, theme_uuid)
+            if theme_uuid and pair not in pairs:
+                pairs[pair] = (make_junction_uuid(proj_at_id, f"theme_name::{tname}"), *pair)
+
+    return list(pairs.values())
 
 
 # ---------------------------------------------------------------------------
@@ -549,6 +669,7 @@ def main():
         # --- Database connection ------------------------------------------
         log(SCRIPT_NAME, "Connecting to PostgreSQL …")
         conn = get_db_connection()
+        conn.set_session(autocommit=False)
         log(SCRIPT_NAME, f"  Connected to {os.getenv('AZURE_POSTGRES_HOST')}")
 
         # --- Apply schema -------------------------------------------------
@@ -557,47 +678,46 @@ def main():
         # --- Fetch from Airtable ------------------------------------------
         log(SCRIPT_NAME, "Fetching Airtable tables …")
 
-        projects_raw = fetch_all_records(
-            config["base_id"],
-            config["table_projects"],
-            config["api_key"],
-            FIELDS["projects"],
-            SCRIPT_NAME,
+        # Tables are independent, so they paginate concurrently under one
+        # shared limit for the base
+        tables = {
+            "projects": config["table_projects"],
+            "organizations": config["table_organizations"],
+            "agencies": config["table_agencies"],
+            "themes": config["table_themes"],
+        }
+        tables = {name: table_id for name, table_id in tables.items() if table_id}
+        session = create_session(
+            pool_size=len(tables),
+            retries=AIRTABLE_RETRIES,
+            backoff_factor=1.0,
+            status_forcelist=AIRTABLE_RETRY_STATUSES,
         )
-        log(SCRIPT_NAME, f"  Projects: {len(projects_raw)} records")
-
-        organizations_raw: List[Dict] = []
-        if config["table_organizations"]:
-            organizations_raw = fetch_all_records(
-                config["base_id"],
-                config["table_organizations"],
-                config["api_key"],
-                FIELDS["organizations"],
-                SCRIPT_NAME,
-            )
-            log(SCRIPT_NAME, f"  Organizations: {len(organizations_raw)} records")
-
-        agencies_raw: List[Dict] = []
-        if config["table_agencies"]:
-            agencies_raw = fetch_all_records(
-                config["base_id"],
-                config["table_agencies"],
-                config["api_key"],
-                FIELDS["agencies"],
-                SCRIPT_NAME,
-            )
-            log(SCRIPT_NAME, f"  Agencies: {len(agencies_raw)} records")
-
-        themes_raw: List[Dict] = []
-        if config["table_themes"]:
-            themes_raw = fetch_all_records(
-                config["base_id"],
-                config["table_themes"],
-                config["api_key"],
-                FIELDS["themes"],
-                SCRIPT_NAME,
-            )
-            log(SCRIPT_NAME, f"  Themes: {len(themes_raw)} records")
+        rate_limiter = TokenBucket(AIRTABLE_RATE_LIMIT)
+
+        with ThreadPoolExecutor(max_workers=len(tables)) as executor:
+            futures = {
+                name: executor.submit(
+                    fetch_all_records,
+                    config["base_id"],
+                    table_id,
+                    config["api_key"],
+                    FIELDS[name],
+                    SCRIPT_NAME,
+                    session,
+                    rate_limiter,
+                )
+                for name, table_id in tables.items()
+            }
+            raw = {name: future.result() for name, future in futures.items()}
+
+        for name, records in raw.items():
+            log(SCRIPT_NAME, f"  {name.capitalize()}: {len(records)} records")
+
+        projects_raw = raw["projects"]
+        organizations_raw: List[Dict] = raw.get("organizations", [])
+        agencies_raw: List[Dict] = raw.get("agencies", [])
+        themes_raw: List[Dict] = raw.get("themes", [])
 
         # --- Extract lookup tables ----------------------------------------
         log(SCRIPT_NAME, "Extracting lookup tables …")
@@ -640,9 +760,12 @@ def main():
         log(SCRIPT_NAME, "Building entity rows …")
 
         agency_rows, agency_at_map = build_agencies_rows(agencies_raw, donor_map, country_map)
-        theme_rows, theme_at_map, theme_name_map = build_themes_rows(themes_raw, inv_type_map)
-        org_rows, org_at_map = build_organizations_rows(organizations_raw, org_type_map, country_map)
-        project_rows, project_at_map = build_projects_rows(projects_raw)
+        theme_rows, theme_at_map, theme_name_map, theme_projects = build_themes_rows(themes_raw, inv_type_map)
+        org_rows, org_at_map, org_links = build_organizations_rows(organizations_raw, org_type_map, country_map)
+        project_rows, project_at_map, project_links = build_projects_rows(projects_raw)
+
+        # Builders keep only the link fields the junction tables need
+        del raw, projects_raw, organizations_raw, agencies_raw, themes_raw
 
         log(SCRIPT_NAME, "Inserting entities …")
         bulk_upsert(
@@ -676,10 +799,10 @@ def main():
         # --- Junction tables ----------------------------------------------
         log(SCRIPT_NAME, "Building junction tables …")
 
-        apf_rows = build_agency_project_funding(projects_raw, agency_at_map, project_at_map)
-        aof_rows = build_agency_organization_funding(organizations_raw, agency_at_map, org_at_map)
-        op_rows = build_organization_project(organizations_raw, org_at_map, project_at_map)
-        pt_rows = build_project_themes(themes_raw, projects_raw, theme_at_map, theme_name_map, project_at_map)
+        apf_rows = build_agency_project_funding(project_links, agency_at_map, project_at_map)
+        aof_rows = build_agency_organization_funding(org_links, agency_at_map, org_at_map)
+        op_rows = build_organization_project(org_links, org_at_map, project_at_map)
+        pt_rows = build_project_themes(theme_projects, project_links, theme_at_map, theme_name_map, project_at_map)
 
         log(SCRIPT_NAME, "Inserting junction tables …")
         bulk_upsert(
@@ -703,6 +826,10 @@ def main():
             pt_rows,
         )
 
+        # All lookup, entity and junction rows are loaded in one transaction;
+        # on failure nothing is committed
+        conn.commit()
+
         # --- Summary ------------------------------------------------------
         log(SCRIPT_NAME, "")
         log(SCRIPT_NAME, "=== PIPELINE SUMMARY ===")
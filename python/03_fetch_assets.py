@@ -17,13 +17,19 @@ Options:
 """
 
 import argparse
+import json
+import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 import requests
 
 from _utils import (
+    TokenBucket,
+    create_session,
     detect_file_extension,
     fetch_all_records,
     log,
@@ -35,39 +41,229 @@ from _utils import (
 LOGO_FIELDS = ["Logo", "org_key"]
 SCREENSHOT_FIELDS = ["Budget Source Screenshot", "org_key"]
 
+# Concurrent downloads sharing one connection pool
+MAX_WORKERS = 16
 
-def download_file(url: str, filepath: Path, script_name: str) -> bool:
+# Chunk size when streaming response bodies to disk
+CHUNK_SIZE = 64 * 1024
+
+# Attempts per file; interrupted downloads resume from the partial file
+DOWNLOAD_ATTEMPTS = 3
+RETRY_BACKOFF = 1.0
+
+# Download budget shared by all workers (requests per second, burst size)
+DOWNLOAD_RATE = 10
+DOWNLOAD_BURST = 10
+
+# ETags of downloaded assets, sent back as If-None-Match on the next run
+ETAGS_PATH = Path(__file__).parent / "cache" / "assets_etags.json"
+
+# download_file outcomes
+DOWNLOADED = "downloaded"
+NOT_MODIFIED = "not_modified"
+FAILED = "failed"
+
+
+@lru_cache(maxsize=1024)
+def cached_file_extension(content_type: str, url_tail: str) -> str:
+    """Memoized detect_file_extension keyed on content type and URL tail.
+    
+    detect_file_extension only checks URL endings up to 5 characters (".jpeg"),
+    so the last 5 characters of the URL decide the same result as the full URL
+    while keeping the cache key small.
+    """
+    return detect_file_extension(content_type, url_tail)
+
+
+def load_etags(path: Path) -> Dict[str, str]:
+    """Load the ETags recorded for previously downloaded assets.
+    
+    Args:
+        path: ETag sidecar file path
+        
+    Returns:
+        Dictionary mapping asset key (e.g., "logos/org.png") to ETag
+    """
+    if not path.exists():
+        return {}
+    
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_etags(path: Path, etags: Dict[str, str]):
+    """Save the ETags of downloaded assets.
+    
+    Args:
+        path: ETag sidecar file path
+        etags: Dictionary mapping asset key to ETag
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(etags, f, indent=2, sort_keys=True)
+
+
+def download_file(
+    session: requests.Session,
+    bucket: TokenBucket,
+    etags: Dict[str, str],
+    url: str,
+    filepath: Path,
+    script_name: str
+) -> str:
     """Download file from URL and save to disk.
     
+    The body is streamed into a `.part` file next to the destination and renamed
+    into place once complete. If a previous attempt left a partial file behind,
+    only the remaining bytes are requested with an HTTP Range header, guarded by
+    If-Range with the validator stored when that partial file was started, so a
+    changed remote file is sent whole instead of appended. If the file
+    already exists and its ETag is known, the request is conditional and a
+    304 Not Modified response leaves the file untouched.
+    
     Args:
+        session: Shared HTTP session
+        bucket: Shared rate limiter
+        etags: ETags by asset key, updated on successful downloads
         url: File URL
         filepath: Destination file path
         script_name: Script name for logging
         
     Returns:
-        True if successful, False otherwise
+        DOWNLOADED, NOT_MODIFIED or FAILED
     """
-    try:
-        response = requests.get(url, timeout=30)
-        if not response.ok:
-            log(script_name, f"Download failed ({response.status_code}): {url}")
-            return False
+    part_path = filepath.with_name(filepath.name + ".part")
+    validator_path = filepath.with_name(filepath.name + ".part.validator")
+    etag_key = f"{filepath.parent.name}/{filepath.name}"
+    
+    for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+        resume_from = part_path.stat().st_size if part_path.exists() else 0
+        validator = validator_path.read_text(encoding="utf-8") if validator_path.exists() else ""
+        if resume_from and not validator:
+            # Without a validator a changed remote file cannot be detected
+            part_path.unlink()
+            resume_from = 0
+        
+        headers = {"Accept-Encoding": "identity"}
+        if resume_from:
+            headers["Range"] = f"bytes={resume_from}-"
+            headers["If-Range"] = validator
+        elif etag_key in etags and filepath.exists():
+            headers["If-None-Match"] = etags[etag_key]
+        
+        try:
+            bucket.acquire()
+            with session.get(url, headers=headers, timeout=30, stream=True) as response:
+                # Local copy is still current
+                if response.status_code == 304:
+                    return NOT_MODIFIED
+                
+                # Partial file no longer matches the remote file: start over
+                if response.status_code == 416:
+                    part_path.unlink()
+                    if validator_path.exists():
+                        validator_path.unlink()
+                    continue
+                
+                if not response.ok:
+                    log(script_name, f"Download failed ({response.status_code}): {url}")
+                    return FAILED
+                
+                # Append only if the server honoured the range, otherwise rewrite
+                # and remember what the new partial file was started from
+                if response.status_code == 206:
+                    mode = "ab"
+                else:
+                    mode = "wb"
+                    # Weak ETags are not allowed in If-Range
+                    remote_etag = response.headers.get("ETag", "")
+                    if remote_etag and not remote_etag.startswith("W/"):
+                        new_validator = remote_etag
+                    else:
+                        new_validator = response.headers.get("Last-Modified", "")
+                    if new_validator:
+                        validator_path.write_text(new_validator, encoding="utf-8")
+                    elif validator_path.exists():
+                        validator_path.unlink()
+                
+                # Stream the body straight to disk instead of buffering it in memory
+                response.raw.decode_content = True
+                with open(part_path, mode) as f:
+                    shutil.copyfileobj(response.raw, f, CHUNK_SIZE)
+                
+                etag = response.headers.get("ETag")
+            
+            part_path.replace(filepath)
+            if validator_path.exists():
+                validator_path.unlink()
+            if etag:
+                etags[etag_key] = etag
+            return DOWNLOADED
         
-        with open(filepath, "wb") as f:
-            f.write(response.content)
+        except Exception as e:
+            log(script_name, f"Error downloading {url} (attempt {attempt}/{DOWNLOAD_ATTEMPTS}): {e}")
+            if attempt < DOWNLOAD_ATTEMPTS:
+                time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+    
+    return FAILED
+
+
+def download_all(
+    session: requests.Session,
+    bucket: TokenBucket,
+    etags: Dict[str, str],
+    downloads: List[Tuple[str, Path]],
+    label: str,
+    script_name: str
+) -> tuple:
+    """Download files concurrently over a shared session.
+    
+    Args:
+        session: Shared HTTP session
+        bucket: Shared rate limiter
+        etags: ETags by asset key
+        downloads: List of (url, filepath) pairs
+        label: Asset label for logging (e.g., "logo")
+        script_name: Script name for logging
         
-        return True
+    Returns:
+        Tuple of (downloaded_count, skipped_count) where skipped covers
+        unchanged and failed files
+    """
+    downloaded = 0
+    skipped = 0
+    
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(download_file, session, bucket, etags, url, filepath, script_name)
+            for url, filepath in downloads
+        ]
+        for (url, filepath), future in zip(downloads, futures):
+            if future.result() == DOWNLOADED:
+                log(script_name, f"Downloaded {label}: {filepath.name}")
+                downloaded += 1
+            else:
+                skipped += 1
     
-    except Exception as e:
-        log(script_name, f"Error downloading {url}: {e}")
-        return False
+    return downloaded, skipped
 
 
-def fetch_logos(config: dict, script_name: str) -> tuple:
-    """Fetch and download organization logos.
+def fetch_logos(
+    config: dict,
+    organizations: List[dict],
+    session: requests.Session,
+    bucket: TokenBucket,
+    etags: Dict[str, str],
+    script_name: str
+) -> tuple:
+    """Download organization logos.
     
     Args:
         config: Configuration dictionary
+        organizations: Organization records including LOGO_FIELDS
+        session: Shared HTTP session
+        bucket: Shared rate limiter
+        etags: ETags by asset key
         script_name: Script name for logging
         
     Returns:
@@ -78,17 +274,10 @@ def fetch_logos(config: dict, script_name: str) -> tuple:
     output_dir = config["project_root"] / "public" / "logos"
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Fetch records
-    organizations = fetch_all_records(
-        config["base_id"],
-        config["table_organizations"],
-        config["api_key"],
-        LOGO_FIELDS,
-        script_name
-    )
-    
-    downloaded = 0
     skipped = 0
+    # Keyed by destination so duplicate org_keys never have two workers
+    # writing the same file; the last record per org wins
+    downloads = {}
     
     for org in organizations:
         fields = org.get("fields", {})
@@ -114,27 +303,39 @@ def fetch_logos(config: dict, script_name: str) -> tuple:
         
         # Detect extension and build filename
         content_type = first_logo.get("type", "")
-        extension = detect_file_extension(content_type, logo_url)
+        extension = cached_file_extension(content_type, logo_url[-5:])
         filename = f"{org_key}{extension}"
-        filepath = output_dir / filename
-        
-        # Download
-        if download_file(logo_url, filepath, script_name):
-            log(script_name, f"Downloaded logo: {filename}")
-            downloaded += 1
-        else:
-            skipped += 1
-        
-        time.sleep(0.1)  # Rate limiting
+        downloads[output_dir / filename] = logo_url
     
-    return downloaded, skipped
+    # Download
+    downloaded, not_downloaded = download_all(
+        session,
+        bucket,
+        etags,
+        [(url, filepath) for filepath, url in downloads.items()],
+        "logo",
+        script_name
+    )
+    
+    return downloaded, skipped + not_downloaded
 
 
-def fetch_screenshots(config: dict, script_name: str) -> tuple:
-    """Fetch and download budget source screenshots.
+def fetch_screenshots(
+    config: dict,
+    organizations: List[dict],
+    session: requests.Session,
+    bucket: TokenBucket,
+    etags: Dict[str, str],
+    script_name: str
+) -> tuple:
+    """Download budget source screenshots.
     
     Args:
         config: Configuration dictionary
+        organizations: Organization records including SCREENSHOT_FIELDS
+        session: Shared HTTP session
+        bucket: Shared rate limiter
+        etags: ETags by asset key
         script_name: Script name for logging
         
     Returns:
@@ -145,17 +346,10 @@ def fetch_screenshots(config: dict, script_name: str) -> tuple:
     output_dir = config["project_root"] / "public" / "screenshots"
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Fetch records
-    organizations = fetch_all_records(
-        config["base_id"],
-        config["table_organizations"],
-        config["api_key"],
-        SCREENSHOT_FIELDS,
-        script_name
-    )
-    
-    downloaded = 0
     skipped = 0
+    # Keyed by destination so concurrent workers never write the same file;
+    # the last screenshot per org wins, as it did when downloading sequentially
+    downloads = {}
     
     for org in organizations:
         fields = org.get("fields", {})
@@ -180,20 +374,21 @@ def fetch_screenshots(config: dict, script_name: str) -> tuple:
             
             # Detect extension and build filename
             content_type = screenshot.get("type", "")
-            extension = detect_file_extension(content_type, screenshot_url)
+            extension = cached_file_extension(content_type, screenshot_url[-5:])
             filename = f"{org_key}{extension}"
-            filepath = output_dir / filename
-            
-            # Download
-            if download_file(screenshot_url, filepath, script_name):
-                log(script_name, f"Downloaded screenshot: {filename}")
-                downloaded += 1
-            else:
-                skipped += 1
-            
-            time.sleep(0.1)  # Rate limiting
+            downloads[output_dir / filename] = screenshot_url
     
-    return downloaded, skipped
+    # Download
+    downloaded, not_downloaded = download_all(
+        session,
+        bucket,
+        etags,
+        [(url, filepath) for filepath, url in downloads.items()],
+        "screenshot",
+        script_name
+    )
+    
+    return downloaded, skipped + not_downloaded
 
 
 def main():
@@ -219,20 +414,42 @@ def main():
         total_downloaded = 0
         total_skipped = 0
         
+        # One pooled session shared by all download workers
+        session = create_session(pool_size=2 * MAX_WORKERS)
+        bucket = TokenBucket(DOWNLOAD_RATE, DOWNLOAD_BURST)
+        etags = load_etags(ETAGS_PATH)
+        
+        # Fetch organization records once with the fields of every requested asset type
+        fields = []
+        if args.logos or fetch_both:
+            fields.extend(LOGO_FIELDS)
+        if args.screenshots or fetch_both:
+            fields.extend(field for field in SCREENSHOT_FIELDS if field not in fields)
+        
+        organizations = fetch_all_records(
+            config["base_id"],
+            config["table_organizations"],
+            config["api_key"],
+            fields,
+            script_name
+        )
+        
         # Fetch logos
         if args.logos or fetch_both:
-            logo_downloaded, logo_skipped = fetch_logos(config, script_name)
+            logo_downloaded, logo_skipped = fetch_logos(config, organizations, session, bucket, etags, script_name)
             total_downloaded += logo_downloaded
             total_skipped += logo_skipped
             log(script_name, f"Logos: {logo_downloaded} downloaded, {logo_skipped} skipped")
         
         # Fetch screenshots
         if args.screenshots or fetch_both:
-            screen_downloaded, screen_skipped = fetch_screenshots(config, script_name)
+            screen_downloaded, screen_skipped = fetch_screenshots(config, organizations, session, bucket, etags, script_name)
             total_downloaded += screen_downloaded
             total_skipped += screen_skipped
             log(script_name, f"Screenshots: {screen_downloaded} downloaded, {screen_skipped} skipped")
         
+        save_etags(ETAGS_PATH, etags)
+        
         # Summary
         log(script_name, "DOWNLOAD SUMMARY:")
         log(script_name, f"  Total downloaded: {total_downloaded}")
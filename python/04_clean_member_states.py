@@ -32,21 +32,17 @@ def main():
     if not input_csv.exists():
         raise FileNotFoundError(f"Input file not found: {input_csv}")
     
-    # Read CSV
-    df = pd.read_csv(input_csv)
+    # Read CSV (only the columns we need)
+    df = pd.read_csv(input_csv, usecols=["Member State", "End date"])
     print(f"[{script_name}] Loaded {len(df)} total member states")
     
     # Filter current members (End date is NaN/empty)
-    df_current = df[df["End date"].isna()]
-    member_list = df_current["Member State"].tolist()
+    df_current = df.loc[df["End date"].isna(), ["Member State"]]
     
     # Add USA
-    member_list.append("USA")
+    out_df = pd.concat([df_current, pd.DataFrame({"Member State": ["USA"]})], ignore_index=True)
     
-    print(f"[{script_name}] Found {len(member_list)} current member states")
-    
-    # Create output dataframe
-    out_df = pd.DataFrame({"Member State": member_list})
+    print(f"[{script_name}] Found {len(out_df)} current member states")
     
     # Save to CSV
     out_df.to_csv(output_csv, index=False)
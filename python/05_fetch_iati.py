@@ -13,22 +13,70 @@ IATI API Limits:
 - Only successful HTTP response codes (200-399) count toward quota
 """
 
+import gzip
+import hashlib
 import json
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
+import pandas as pd
 import requests
 from dotenv import load_dotenv
 
-from _utils import setup_environment, validate_config
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from _utils import TokenBucket, create_session, setup_environment, validate_config
 
 # Configuration
 CACHE_DIR = Path(__file__).parent / "cache" / "iati"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
-RATE_LIMIT_DELAY = 0.5  # 500ms between requests (safer to avoid 429 errors)
+RATE_LIMIT = 5  # IATI allows 5 requests/second, shared by all workers
+MAX_WORKERS = 5  # Organizations fetched concurrently
+CACHE_TTL_SECONDS = 86400  # Cached queries older than a day are fetched again
+MAX_ROWS = 1000  # Datastore ceiling for rows per request
+ACTIVITY_LIMIT = 100  # Activities fetched per organization
+TRANSACTION_LIMIT = 5000  # Transactions fetched per organization
+BATCH_SIZE = 10  # Organizations combined into one OR query
+RETRY_STATUSES = (429, 500, 502, 503, 504)  # Retried with backoff, honouring Retry-After
+
+
+# Fields requested per endpoint
+ENDPOINT_FIELDS = {
+    "activity": [
+        "iati_identifier",
+        "title_narrative",
+        "description_narrative",
+        "activity_status_code",
+        "activity_date_iso_date",
+        "activity_date_type",
+        "sector_code",
+        "sector_narrative",
+        "recipient_country_code",
+        "recipient_country_narrative",
+        "budget_value",
+        "transaction_value",
+        "reporting_org_ref",
+        "reporting_org_narrative"
+    ],
+    "transaction": [
+        "iati_identifier",
+        "transaction_type_code",
+        "transaction_date_iso_date",
+        "transaction_value",
+        "transaction_value_currency"
+    ],
+}
+
+# Org reference fields each endpoint is queried on
+ACTIVITY_REF_FIELDS = ("reporting_org_ref", "participating_org_ref")
+TRANSACTION_REF_FIELDS = ("transaction_provider_org_ref", "transaction_receiver_org_ref")
 
 
 def load_iati_api_key() -> str:
@@ -52,162 +100,247 @@ def load_iati_api_key() -> str:
     return api_key
 
 
+def read_cache(cache_file: Path) -> List[Dict[str, Any]]:
+    """Read cached API documents from a gzipped JSON file.
+    
+    Args:
+        cache_file: Cache file path
+        
+    Returns:
+        List of cached documents
+    """
+    with gzip.open(cache_file, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def write_cache(cache_file: Path, docs: List[Dict[str, Any]]):
+    """Write API documents to a gzipped JSON cache file.
+    
+    Args:
+        cache_file: Cache file path
+        docs: Documents to cache
+    """
+    data = orjson.dumps(docs) if orjson else json.dumps(docs, ensure_ascii=False).encode('utf-8')
+    with gzip.open(cache_file, 'wb', compresslevel=3) as f:
+        f.write(data)
+
+
 def query_iati_api(
     query: Dict[str, Any],
     endpoint: str,
-    api_key: str,
+    session: requests.Session,
+    bucket: TokenBucket,
     use_cache: bool = True,
-    max_records: Optional[int] = None
+    max_records: Optional[int] = None,
+    extra_fields: Sequence[str] = ()
 ) -> List[Dict[str, Any]]:
     """Query IATI API with pagination and caching.
     
     Args:
         query: Query parameters for the API
         endpoint: API endpoint (activity, transaction, or budget)
-        api_key: IATI API key
+        session: Shared HTTP session carrying the API key header
+        bucket: Shared rate limiter
         use_cache: Whether to use cached results
         max_records: Maximum number of records to fetch (None for all)
+        extra_fields: Fields to request on top of the endpoint defaults
         
     Returns:
         List of documents from the API
+        
+    Raises:
+        requests.RequestException: If a request fails or a page is not returned
+            with status 200; nothing is cached in that case
     """
     valid_endpoints = ["activity", "transaction", "budget"]
     if endpoint not in valid_endpoints:
         raise ValueError(f"Invalid endpoint. Must be one of {valid_endpoints}.")
     
-    # Create cache filename based on query and endpoint
-    cache_key = f"{endpoint}_{hash(str(sorted(query.items())))}.json"
+    # Request only the fields we actually need based on endpoint
+    if endpoint in ENDPOINT_FIELDS:
+        fields = ",".join(ENDPOINT_FIELDS[endpoint] + [f for f in extra_fields if f not in ENDPOINT_FIELDS[endpoint]])
+    else:
+        fields = "*"  # fallback
+    # Work on a copy so the caller's query is not changed by pagination
+    query = {**query, "fl": fields}
+    
+    # Create cache filename based on the full request; the digest must be
+    # stable across runs, which the salted built-in hash() is not
+    key_src = json.dumps(
+        {"query": query, "max_records": max_records},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str,
+    ).encode()
+    digest = hashlib.blake2b(key_src, digest_size=16).hexdigest()
+    cache_key = f"{endpoint}_{digest}.json.gz"
     cache_file = CACHE_DIR / cache_key
     
-    # Try to load from cache
+    # Try to load from cache while it is within the TTL
     if use_cache and cache_file.exists():
-        print(f"  Loading from cache: {cache_key}")
-        with open(cache_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        if time.time() - cache_file.stat().st_mtime < CACHE_TTL_SECONDS:
+            print(f"  Loading from cache: {cache_key}")
+            return read_cache(cache_file)
     
     # Query the API
     base_url = f"https://api.iatistandard.org/datastore/{endpoint}/select"
-    headers = {"Ocp-Apim-Subscription-Key": api_key}
     all_docs = []
     
-    query["start"] = 0
-    query["rows"] = 1000  # max rows per request
+    # Deep paging with a Solr cursor instead of start offsets, which the server
+    # has to re-scan on every page; cursors require a sort on the unique key
+    query["sort"] = "id asc"
+    query["cursorMark"] = "*"
+    query["rows"] = MAX_ROWS
     
-    # Request only the fields we actually need based on endpoint
-    if endpoint == "activity":
-        query["fl"] = ",".join([
-            "iati_identifier",
-            "title_narrative",
-            "description_narrative",
-            "activity_status_code",
-            "activity_date_iso_date",
-            "activity_date_type",
-            "sector_code",
-            "sector_narrative",
-            "recipient_country_code",
-            "recipient_country_narrative",
-            "budget_value",
-            "transaction_value",
-            "reporting_org_ref",
-            "reporting_org_narrative"
-        ])
-    elif endpoint == "transaction":
-        query["fl"] = ",".join([
-            "iati_identifier",
-            "transaction_type_code",
-            "transaction_date_iso_date",
-            "transaction_value",
-            "transaction_value_currency"
-        ])
-    else:
-        query["fl"] = "*"  # fallback
+    print(f"  Querying IATI API: {endpoint}")
+    page = 0
     
-    try:
-        print(f"  Querying IATI API: {endpoint}")
-        page = 0
+    while True:
+        # Never ask for more rows than are still needed
+        if max_records:
+            query["rows"] = min(MAX_ROWS, max_records - len(all_docs))
         
-        while True:
-            time.sleep(RATE_LIMIT_DELAY)  # Rate limiting
-            response = requests.get(base_url, params=query, headers=headers)
+        bucket.acquire()  # Rate limiting
+        response = session.get(base_url, params=query)
+        
+        if response.status_code == 200:
+            data = response.json()
+            
+            if page == 0:
+                num_found = data.get("response", {}).get("numFound", 0)
+                print(f"    Found {num_found} total records")
             
-            if response.status_code == 200:
-                data = response.json()
+            docs = data.get("response", {}).get("docs", [])
+            if docs:
+                all_docs.extend(docs)
+                page += 1
+                if page % 5 == 0:
+                    print(f"    Downloaded {len(all_docs)} records...")
                 
-                if page == 0:
-                    num_found = data.get("response", {}).get("numFound", 0)
-                    print(f"    Found {num_found} total records")
+                # Check if we've hit the max_records limit
+                if max_records and len(all_docs) >= max_records:
+                    print(f"    Reached max_records limit ({max_records})")
+                    all_docs = all_docs[:max_records]
+                    break
                 
-                docs = data.get("response", {}).get("docs", [])
-                if docs:
-                    all_docs.extend(docs)
-                    query["start"] += len(docs)
-                    page += 1
-                    if page % 5 == 0:
-                        print(f"    Downloaded {len(all_docs)} records...")
-                    
-                    # Check if we've hit the max_records limit
-                    if max_records and len(all_docs) >= max_records:
-                        print(f"    Reached max_records limit ({max_records})")
-                        all_docs = all_docs[:max_records]
-                        break
-                else:
+                # The cursor stops advancing once the result set is exhausted
+                next_cursor = data.get("nextCursorMark")
+                if not next_cursor or next_cursor == query["cursorMark"]:
                     break
+                query["cursorMark"] = next_cursor
             else:
-                print(f"  ERROR: {response.status_code} - {response.reason}")
                 break
-                
-        print(f"    Completed: {len(all_docs)} records downloaded")
-        
-        # Save to cache
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(all_docs, f, ensure_ascii=False, indent=2)
-        
-        return all_docs
+        else:
+            # Fail the whole query rather than return a truncated result; a
+            # partial result would be cached and hide the error until the TTL expires
+            print(f"  ERROR: {response.status_code} - {response.reason}")
+            raise requests.HTTPError(
+                f"{response.status_code} {response.reason} for {base_url}", response=response
+            )
+            
+    print(f"    Completed: {len(all_docs)} records downloaded")
+    
+    # Save to cache, only once the whole query has succeeded
+    write_cache(cache_file, all_docs)
+    
+    return all_docs
+
+
+def activity_clause(org_ref: str) -> str:
+    """Solr clause for activities where the org is reporting or participating."""
+    return f'reporting_org_ref:"{org_ref}" OR participating_org_ref:"{org_ref}"'
+
+
+def transaction_clause(org_ref: str) -> str:
+    """Solr clause for transactions where the org is provider or receiver."""
+    return f'transaction_provider_org_ref:"{org_ref}" OR transaction_receiver_org_ref:"{org_ref}"'
+
+
+def _mentions_org(doc: Dict[str, Any], ref_fields: Sequence[str], org_ref: str) -> bool:
+    """Check whether any of the reference fields (scalar or list) holds org_ref."""
+    for field in ref_fields:
+        value = doc.get(field)
+        if value == org_ref or (isinstance(value, list) and org_ref in value):
+            return True
+    return False
+
+
+def query_iati_batch(
+    org_refs: List[str],
+    endpoint: str,
+    clause: Callable[[str], str],
+    ref_fields: Sequence[str],
+    per_org_limit: int,
+    session: requests.Session,
+    bucket: TokenBucket
+) -> Dict[str, Optional[List[Dict[str, Any]]]]:
+    """Query several organizations with one OR query and split the results per org.
+    
+    Documents are sorted on the unique id, so each org's share comes back in the
+    same order a single-org query would return it. If the batch reaches its record
+    cap, an org that still got `per_org_limit` documents from the id-sorted prefix
+    is complete; the others may be missing documents and map to None so the
+    caller can fall back to per-org queries for just those.
+    
+    Args:
+        org_refs: Organization references in the batch
+        endpoint: API endpoint (activity or transaction)
+        clause: Builds the Solr clause for one org reference
+        ref_fields: Document fields holding org references, used to split results
+        per_org_limit: Maximum number of records kept per organization
+        session: Shared HTTP session carrying the API key header
+        bucket: Shared rate limiter
         
-    except requests.exceptions.RequestException as e:
-        print(f"  ERROR: {e}")
-        return []
+    Returns:
+        Dictionary mapping org reference to its documents, or to None if incomplete
+    """
+    query = {"q": " OR ".join(f"({clause(org_ref)})" for org_ref in org_refs)}
+    batch_limit = per_org_limit * len(org_refs)
+    
+    docs = query_iati_api(
+        query, endpoint, session, bucket,
+        max_records=batch_limit, extra_fields=ref_fields
+    )
+    truncated = len(docs) >= batch_limit
+    
+    # Drop the reference fields that were only requested for splitting
+    added_fields = [f for f in ref_fields if f not in ENDPOINT_FIELDS[endpoint]]
+    
+    by_org = {}
+    for org_ref in org_refs:
+        matched = [doc for doc in docs if _mentions_org(doc, ref_fields, org_ref)][:per_org_limit]
+        if truncated and len(matched) < per_org_limit:
+            by_org[org_ref] = None
+            continue
+        by_org[org_ref] = [
+            {key: value for key, value in doc.items() if key not in added_fields}
+            for doc in matched
+        ]
+    return by_org
 
 
-def fetch_iati_activities_for_org(
+def summarize_org(
     org_ref: str,
     org_name: str,
-    api_key: str
+    activities: List[Dict[str, Any]],
+    transactions: List[Dict[str, Any]]
 ) -> Dict[str, Any]:
-    """Fetch IATI activities for a single organization.
+    """Build the stored IATI record for one organization.
     
     Args:
         org_ref: Organization reference/identifier in IATI
         org_name: Organization name (for display)
-        api_key: IATI API key
+        activities: Activities fetched for the organization
+        transactions: Transactions fetched for the organization
         
     Returns:
         Dictionary containing activities, transactions, and summary statistics
     """
-    print(f"Fetching IATI data for: {org_name} ({org_ref})")
-    
-    # Query for activities where the org is reporting or participating
-    # Limit to 100 activities max, we'll filter to the 50 most relevant
-    activity_query = {
-        "q": f'reporting_org_ref:"{org_ref}" OR participating_org_ref:"{org_ref}"'
-    }
-    
-    activities = query_iati_api(activity_query, "activity", api_key, max_records=100)
-    
     # Limit activities to most recent/relevant 50 to reduce data size
     # Sort by presence of budget value (funded projects first) and limit
     activities_with_budget = [a for a in activities if a.get("budget_value")]
     activities_without_budget = [a for a in activities if not a.get("budget_value")]
     limited_activities = (activities_with_budget[:30] + activities_without_budget[:20])[:50]
     
-    # Query transactions where this org is provider or receiver
-    # Limit to 5000 transactions max to avoid overwhelming the API and data storage
-    transaction_query = {
-        "q": f'transaction_provider_org_ref:"{org_ref}" OR transaction_receiver_org_ref:"{org_ref}"'
-    }
-    
-    transactions = query_iati_api(transaction_query, "transaction", api_key, max_records=5000)
-    
     # Aggregate transaction data instead of storing all raw transactions
     transaction_summary = aggregate_transactions(transactions)
     
@@ -228,6 +361,115 @@ def fetch_iati_activities_for_org(
     }
 
 
+def fetch_iati_activities_for_org(
+    org_ref: str,
+    org_name: str,
+    session: requests.Session,
+    bucket: TokenBucket
+) -> Dict[str, Any]:
+    """Fetch IATI activities for a single organization.
+    
+    Args:
+        org_ref: Organization reference/identifier in IATI
+        org_name: Organization name (for display)
+        session: Shared HTTP session carrying the API key header
+        bucket: Shared rate limiter
+        
+    Returns:
+        Dictionary containing activities, transactions, and summary statistics
+    """
+    print(f"Fetching IATI data for: {org_name} ({org_ref})")
+    
+    # Query for activities where the org is reporting or participating
+    # Limit to 100 activities max, we'll filter to the 50 most relevant
+    activity_query = {"q": activity_clause(org_ref)}
+    activities = query_iati_api(activity_query, "activity", session, bucket, max_records=ACTIVITY_LIMIT)
+    
+    # Query transactions where this org is provider or receiver
+    # Limit to 5000 transactions max to avoid overwhelming the API and data storage
+    transaction_query = {"q": transaction_clause(org_ref)}
+    transactions = query_iati_api(transaction_query, "transaction", session, bucket, max_records=TRANSACTION_LIMIT)
+    
+    return summarize_org(org_ref, org_name, activities, transactions)
+
+
+def fetch_iati_batch(
+    orgs: List[Tuple[str, str]],
+    session: requests.Session,
+    bucket: TokenBucket
+) -> List[Dict[str, Any]]:
+    """Fetch IATI data for a batch of organizations with combined queries.
+    
+    Activities and transactions are each fetched with one OR query for the whole
+    batch; orgs left incomplete by a batch that hit the record cap are fetched
+    per org.
+    
+    Args:
+        orgs: List of (org_ref, org_name) pairs
+        session: Shared HTTP session carrying the API key header
+        bucket: Shared rate limiter
+        
+    Returns:
+        List of per-organization IATI data, in batch order
+    """
+    if len(orgs) == 1:
+        return [fetch_iati_activities_for_org(orgs[0][0], orgs[0][1], session, bucket)]
+    
+    org_refs = [org_ref for org_ref, _ in orgs]
+    print(f"Fetching IATI data for {len(orgs)} organizations: {', '.join(org_refs)}")
+    
+    activities = query_iati_batch(
+        org_refs, "activity", activity_clause, ACTIVITY_REF_FIELDS,
+        ACTIVITY_LIMIT, session, bucket
+    )
+    transactions = query_iati_batch(
+        org_refs, "transaction", transaction_clause, TRANSACTION_REF_FIELDS,
+        TRANSACTION_LIMIT, session, bucket
+    )
+    
+    results = []
+    for org_ref, org_name in orgs:
+        org_activities = activities[org_ref]
+        if org_activities is None:
+            org_activities = query_iati_api(
+                {"q": activity_clause(org_ref)}, "activity", session, bucket,
+                max_records=ACTIVITY_LIMIT
+            )
+        
+        org_transactions = transactions[org_ref]
+        if org_transactions is None:
+            org_transactions = query_iati_api(
+                {"q": transaction_clause(org_ref)}, "transaction", session, bucket,
+                max_records=TRANSACTION_LIMIT
+            )
+        
+        results.append(summarize_org(org_ref, org_name, org_activities, org_transactions))
+    
+    return results
+
+
+def _first_values(series: pd.Series) -> pd.Series:
+    """Take the first element of list values, leaving scalar values untouched.
+    
+    Empty lists become NaN. The series index must be unique.
+    """
+    exploded = series.explode()
+    return exploded[~exploded.index.duplicated()]
+
+
+def _leading_values(series: pd.Series, limit: int) -> pd.Series:
+    """Flatten list values to their first `limit` elements, dropping empty values."""
+    exploded = series[series.astype(bool)].explode()
+    exploded = exploded[exploded.groupby(level=0).cumcount() < limit]
+    return exploded.dropna()
+
+
+def _top_counts(values: pd.Series, limit: int) -> Dict[str, int]:
+    """Count values and keep the `limit` most frequent, ties in first-seen order."""
+    counts = values.groupby(values, sort=False).size()
+    return counts.sort_values(ascending=False, kind="stable").head(limit).to_dict()
+
+
 def aggregate_transactions(transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Aggregate transaction data into summary statistics.
     
@@ -246,56 +488,37 @@ def aggregate_transactions(transactions: List[Dict[str, Any]]) -> Dict[str, Any]
             "count": 0
         }
     
-    by_type: Dict[str, Dict[str, Any]] = {}
-    by_currency: Dict[str, float] = {}
-    by_year: Dict[str, float] = {}
-    total_value = 0.0
-    
-    for txn in transactions:
-        # Aggregate by type
-        txn_type = txn.get("transaction_type_code", "unknown")
-        
-        # Handle transaction_value which could be int, float, or list
-        raw_value = txn.get("transaction_value", 0)
-        if isinstance(raw_value, list):
-            txn_value = raw_value[0] if raw_value else 0
-        else:
-            txn_value = raw_value or 0
-        
-        # Handle transaction_currency which could be string or list
-        raw_currency = txn.get("transaction_value_currency", "USD")
-        if isinstance(raw_currency, list):
-            txn_currency = raw_currency[0] if raw_currency else "USD"
-        else:
-            txn_currency = raw_currency or "USD"
-        
-        if txn_type not in by_type:
-            by_type[txn_type] = {"count": 0, "total_value": 0}
-        by_type[txn_type]["count"] += 1
-        by_type[txn_type]["total_value"] += txn_value
-        
-        # Aggregate by currency
-        if txn_currency not in by_currency:
-            by_currency[txn_currency] = 0
-        by_currency[txn_currency] += txn_value
-        
-        # Aggregate by year
-        raw_date = txn.get("transaction_date_iso_date", "")
-        if isinstance(raw_date, list):
-            txn_date = raw_date[0] if raw_date else ""
-        else:
-            txn_date = raw_date or ""
-            
-        if txn_date and len(txn_date) >= 4:
-            year = txn_date[:4]
-            if year not in by_year:
-                by_year[year] = 0
-            by_year[year] += txn_value
-        
-        total_value += txn_value
+    df = pd.DataFrame.from_records(transactions, columns=[
+        "transaction_type_code",
+        "transaction_value",
+        "transaction_value_currency",
+        "transaction_date_iso_date"
+    ])
+    
+    # Value, currency and date may each be a scalar or a list; use the first entry
+    values = pd.to_numeric(_first_values(df["transaction_value"]), errors="coerce").fillna(0)
+    currencies = df["transaction_value_currency"]
+    currencies = _first_values(currencies.where(currencies.notna() & (currencies != ""), "USD")).fillna("USD")
+    dates = _first_values(df["transaction_date_iso_date"]).fillna("").astype(str)
+    
+    txns = pd.DataFrame({
+        "type": df["transaction_type_code"].fillna("unknown"),
+        "value": values,
+        "currency": currencies,
+        "year": dates.str[:4].where(dates.str.len() >= 4),
+    })
+    
+    # Aggregate by type, currency and year (groups keep first-seen order)
+    type_stats = txns.groupby("type", sort=False)["value"].agg(["count", "sum"])
+    by_type = {
+        txn_type: {"count": int(row["count"]), "total_value": float(row["sum"])}
+        for txn_type, row in type_stats.iterrows()
+    }
+    by_currency = txns.groupby("currency", sort=False)["value"].sum().to_dict()
+    by_year = txns.dropna(subset=["year"]).groupby("year", sort=False)["value"].sum().to_dict()
     
     return {
-        "total_value": total_value,
+        "total_value": float(values.sum()),
         "by_type": by_type,
         "by_currency": by_currency,
         "by_year": by_year,
@@ -321,43 +544,23 @@ def aggregate_activities(activities: List[Dict[str, Any]]) -> Dict[str, Any]:
             "count": 0
         }
     
-    by_status: Dict[str, int] = {}
-    by_sector: Dict[str, int] = {}
-    by_country: Dict[str, int] = {}
-    total_budget = 0.0
+    df = pd.DataFrame.from_records(activities, columns=[
+        "activity_status_code",
+        "budget_value",
+        "sector_narrative",
+        "recipient_country_code"
+    ])
     
-    for activity in activities:
-        # Aggregate by status
-        status = activity.get("activity_status_code", "unknown")
-        by_status[status] = by_status.get(status, 0) + 1
-        
-        # Aggregate budget
-        budget = activity.get("budget_value")
-        if budget:
-            if isinstance(budget, list):
-                total_budget += sum(budget)
-            else:
-                total_budget += budget
-        
-        # Aggregate by sector
-        sectors = activity.get("sector_narrative", [])
-        if sectors:
-            if not isinstance(sectors, list):
-                sectors = [sectors]
-            for sector in sectors[:3]:  # Top 3 sectors per activity
-                by_sector[sector] = by_sector.get(sector, 0) + 1
-        
-        # Aggregate by country
-        countries = activity.get("recipient_country_code", [])
-        if countries:
-            if not isinstance(countries, list):
-                countries = [countries]
-            for country in countries[:3]:  # Top 3 countries per activity
-                by_country[country] = by_country.get(country, 0) + 1
-    
-    # Sort and limit sectors/countries to top 10
-    top_sectors = dict(sorted(by_sector.items(), key=lambda x: x[1], reverse=True)[:10])
-    top_countries = dict(sorted(by_country.items(), key=lambda x: x[1], reverse=True)[:10])
+    # Aggregate by status
+    statuses = df["activity_status_code"].fillna("unknown")
+    by_status = statuses.groupby(statuses, sort=False).size().to_dict()
+    
+    # Aggregate budget (list values are summed)
+    total_budget = float(pd.to_numeric(df["budget_value"].explode(), errors="coerce").sum())
+    
+    # Top 3 sectors/countries per activity, then top 10 overall
+    top_sectors = _top_counts(_leading_values(df["sector_narrative"].dropna(), 3), 10)
+    top_countries = _top_counts(_leading_values(df["recipient_country_code"].dropna(), 3), 10)
     
     return {
         "total_budget": total_budget,
@@ -385,35 +588,71 @@ def main():
         print("Please run 01_fetch_airtable.py first")
         raise SystemExit(1)
     
-    with open(orgs_file, 'r', encoding='utf-8') as f:
-        organizations = json.load(f)
+    if orjson:
+        organizations = orjson.loads(orgs_file.read_bytes())
+    else:
+        with open(orgs_file, 'r', encoding='utf-8') as f:
+            organizations = json.load(f)
     
     print(f"\nLoaded {len(organizations)} organizations")
     
-    # Filter organizations with IATI Org Key
-    orgs_with_iati = [
-        org for org in organizations
-        if org.get("fields", {}).get("IATI Org Key")
-    ]
+    # Filter organizations with IATI Org Key and resolve the key/name fallbacks
+    # column-wise before any request is issued
+    orgs_df = pd.json_normalize(organizations).reindex(columns=[
+        "id",
+        "fields.org_key",
+        "fields.IATI Org Key",
+        "fields.Org Full Name",
+        "fields.Org Short Name"
+    ])
+    orgs_df.columns = ["id", "org_key", "iati_org_ref", "full_name", "short_name"]
+    orgs_df = orgs_df[orgs_df["iati_org_ref"].notna() & (orgs_df["iati_org_ref"] != "")]
+    
+    orgs_with_iati = pd.DataFrame({
+        "org_key": orgs_df["org_key"].fillna(orgs_df["id"]),
+        "iati_org_ref": orgs_df["iati_org_ref"],
+        "org_name": orgs_df["full_name"].fillna(orgs_df["short_name"]).fillna("Unknown"),
+    })
     
     print(f"Found {len(orgs_with_iati)} organizations with IATI Org Keys")
     
-    if not orgs_with_iati:
+    if orgs_with_iati.empty:
         print("\nNo organizations with IATI keys found. Nothing to fetch.")
         return
     
-    # Fetch IATI data for each organization
-    iati_data = {}
-    
-    for i, org in enumerate(orgs_with_iati, 1):
-        org_key = org["fields"].get("org_key", org["id"])
-        iati_org_ref = org["fields"]["IATI Org Key"]
-        org_name = org["fields"].get("Org Full Name", org["fields"].get("Org Short Name", "Unknown"))
-        
-        print(f"\n[{i}/{len(orgs_with_iati)}] Processing: {org_name}")
-        
-        org_data = fetch_iati_activities_for_org(iati_org_ref, org_name, api_key)
-        iati_data[org_key] = org_data
+    # Fetch IATI data for several organizations at once; the shared token
+    # bucket keeps the combined request rate within the API limit
+    session = create_session(pool_size=16, retries=5, backoff_factor=0.5, status_forcelist=RETRY_STATUSES)
+    session.headers["Ocp-Apim-Subscription-Key"] = api_key
+    bucket = TokenBucket(RATE_LIMIT)
+    
+    # Organizations are queried in batches combined into single OR queries
+    orgs = list(zip(orgs_with_iati["iati_org_ref"], orgs_with_iati["org_name"]))
+    results: List[Optional[Dict[str, Any]]] = [None] * len(orgs)
+    
+    # Batches are collected as they finish, so one slow batch does not hold
+    # back the others; results keep their input order
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(fetch_iati_batch, orgs[start:start + BATCH_SIZE], session, bucket): start
+            for start in range(0, len(orgs), BATCH_SIZE)
+        }
+        processed = 0
+        for future in as_completed(futures):
+            start = futures[future]
+            batch = orgs[start:start + BATCH_SIZE]
+            try:
+                batch_data = future.result()
+            except Exception as e:
+                # Keep the finished batches; this batch's orgs are stored empty
+                print(f"\n  ERROR fetching {', '.join(org_ref for org_ref, _ in batch)}: {e}")
+                batch_data = [summarize_org(org_ref, org_name, [], []) for org_ref, org_name in batch]
+            for offset, org_data in enumerate(batch_data):
+                results[start + offset] = org_data
+                processed += 1
+                print(f"\n[{processed}/{len(orgs)}] Processed: {org_data['org_name']}")
+    
+    iati_data = dict(zip(orgs_with_iati["org_key"], results))
     
     # Save results
     output_file = config["project_root"] / "public" / "data" / "iati-data.json"
@@ -421,8 +660,12 @@ def main():
     print(f"\n{'=' * 80}")
     print("Saving IATI data...")
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(iati_data, f, ensure_ascii=False, indent=2)
+    if orjson:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(iati_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(iati_data, f, ensure_ascii=False, indent=2)
     
     print(f"✓ Saved IATI data to: {output_file}")
     
@@ -4,14 +4,19 @@ This module provides common functionality used across all data fetching and proc
 """
 
 import os
+import re
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 import urllib.parse
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 def setup_environment() -> Dict[str, Any]:
@@ -72,6 +77,69 @@ def log(script_name: str, *args):
     print(f"[{script_name}]", *args)
 
 
+def create_session(
+    pool_size: int = 32,
+    retries: int = 3,
+    backoff_factor: float = 0.3,
+    status_forcelist: Sequence[int] = ()
+) -> requests.Session:
+    """Create a requests session with a shared connection pool and retries.
+    
+    Responses with a status in `status_forcelist` are retried with backoff,
+    honouring any Retry-After header; once retries run out the last response
+    is returned to the caller rather than raised.
+    
+    Args:
+        pool_size: Number of pooled connections per host
+        retries: Maximum retries for failed connections and requests
+        backoff_factor: Exponential backoff factor between retries
+        status_forcelist: HTTP status codes to retry (e.g., 429, 503)
+        
+    Returns:
+        Configured requests.Session
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=status_forcelist,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter.
+    
+    Tokens refill continuously at `rate` per second up to `capacity`, so callers
+    may burst up to `capacity` requests and are then held to the average rate.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
 def build_airtable_url(base_id: str, table_identifier: str, params: Optional[Dict[str, Any]] = None) -> str:
     """Build complete Airtable API URL with query parameters.
     
@@ -102,12 +170,17 @@ def build_airtable_url(base_id: str, table_identifier: str, params: Optional[Dic
     return base_url + ("?" + "&".join(parts) if parts else "")
 
 
-def fetch_airtable_page(url: str, api_key: str) -> Dict[str, Any]:
+def fetch_airtable_page(
+    url: str,
+    api_key: str,
+    session: Optional[requests.Session] = None
+) -> Dict[str, Any]:
     """Fetch a single page from Airtable API.
     
     Args:
         url: Complete API URL
         api_key: Airtable API key
+        session: Optional session to reuse pooled connections
         
     Returns:
         JSON response as dictionary
@@ -120,7 +193,7 @@ def fetch_airtable_page(url: str, api_key: str) -> Dict[str, Any]:
         "Content-Type": "application/json",
     }
     
-    response = requests.get(url, headers=headers, timeout=30)
+    response = (session or requests).get(url, headers=headers, timeout=30)
     if not response.ok:
         raise RuntimeError(
             f"Airtable API error: {response.status_code} {response.reason}\n{response.text}"
@@ -134,7 +207,9 @@ def fetch_all_records(
     table_identifier: str,
     api_key: str,
     fields: Optional[List[str]] = None,
-    script_name: str = "script"
+    script_name: str = "script",
+    session: Optional[requests.Session] = None,
+    rate_limiter: Optional[TokenBucket] = None
 ) -> List[Dict[str, Any]]:
     """Fetch all records from an Airtable table with automatic pagination.
     
@@ -144,6 +219,8 @@ def fetch_all_records(
         api_key: Airtable API key
         fields: Optional list of field names to fetch
         script_name: Name for logging
+        session: Optional session to reuse pooled connections
+        rate_limiter: Optional limiter shared by concurrent fetches from one base
         
     Returns:
         List of all records
@@ -162,7 +239,9 @@ def fetch_all_records(
         url = build_airtable_url(base_id, table_identifier, params)
         page += 1
         
-        data = fetch_airtable_page(url, api_key)
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        data = fetch_airtable_page(url, api_key, session)
         records = data.get("records", [])
         all_records.extend(records)
         
@@ -175,6 +254,11 @@ def fetch_all_records(
     return all_records
 
 
+# Separators, and the characters that can shield a separator from splitting
+_SEPARATOR_RE = re.compile(r"[,;]")
+_NESTING_RE = re.compile(r"[()\"']")
+
+
 def split_respecting_parentheses(text: str) -> List[str]:
     """Split string by commas/semicolons while respecting parentheses and quotes.
     
@@ -187,51 +271,43 @@ def split_respecting_parentheses(text: str) -> List[str]:
     if not text:
         return []
     
+    # Without parentheses or quotes every separator splits
+    if not _NESTING_RE.search(text):
+        return [token for token in map(str.strip, _SEPARATOR_RE.split(text)) if token]
+    
+    # Scan once, remembering where the current token starts, and slice the
+    # token out at each separator instead of building it char by char
     tokens = []
-    current = ""
+    start = 0
     depth = 0
-    in_quotes = False
     quote_char = ""
     
-    for char in text:
-        # Handle quotes
-        if char in ('"', "'") and not in_quotes:
-            in_quotes = True
-            quote_char = char
-            current += char
-            continue
-        if char == quote_char and in_quotes:
-            in_quotes = False
-            quote_char = ""
-            current += char
+    for i, char in enumerate(text):
+        # Inside quotes only the closing quote matters
+        if quote_char:
+            if char == quote_char:
+                quote_char = ""
             continue
         
-        # Handle parentheses
-        if char == "(" and not in_quotes:
+        if char in "\"'":
+            quote_char = char
+        elif char == "(":
             depth += 1
-            current += char
-            continue
-        if char == ")" and not in_quotes:
+        elif char == ")":
             depth = max(0, depth - 1)
-            current += char
-            continue
-        
-        # Split on comma/semicolon at depth 0
-        if char in ",;" and not in_quotes and depth == 0:
-            if current.strip():
-                tokens.append(current.strip())
-            current = ""
-            continue
-        
-        current += char
+        elif char in ",;" and depth == 0:
+            # Split on comma/semicolon at depth 0
+            tokens.append(text[start:i])
+            start = i + 1
     
-    if current.strip():
-        tokens.append(current.strip())
+    tokens.append(text[start:])
     
-    # Clean quotes from tokens
+    # Drop empty tokens and clean quotes
     cleaned = []
     for token in tokens:
         token = token.strip()
+        if not token:
+            continue
         if (token.startswith('"') and token.endswith('"')) or \
            (token.startswith("'") and token.endswith("'")):
             token = token[1:-1].strip()
@@ -1,4 +1,3 @@
-import csv
 from pathlib import Path
 
 import pandas as pd
@@ -57,16 +56,17 @@ orgs_df = df[["reporting_org_narrative", "participating_org_narrative"]]
 orgs_df = orgs_df.map(lambda x: list(set(x)) if isinstance(x, list) else x)
 
 
-edge_list = []
-for _, row in orgs_df.iterrows():
-    reporting_orgs = row["reporting_org_narrative"]
-    participating_orgs = row["participating_org_narrative"]
-    if not isinstance(reporting_orgs, list) or not isinstance(participating_orgs, list):
-        continue
-    for a in reporting_orgs:
-        for b in participating_orgs:
-            if a != b:
-                edge_list.append((a, b))
+# reporting x participating cross product per row, only where both are lists
+edge_list = (
+    orgs_df[orgs_df.map(lambda x: isinstance(x, list)).all(axis=1)]
+    .explode("reporting_org_narrative")
+    .explode("participating_org_narrative")
+    .dropna()
+)
+edge_list = edge_list[
+    edge_list["reporting_org_narrative"] != edge_list["participating_org_narrative"]
+]
+edge_list.columns = ["Source", "Target"]
 
 
 data_folder = Path("data")
@@ -74,12 +74,11 @@ data_folder = Path("data")
 # Ensure the output directory exists
 
 # Save to CSV file
-with open(
-    data_folder / "output" / f"edge_list{title_narrative_search}.csv", "w", newline=""
-) as f:
-    writer = csv.writer(f)
-    writer.writerow(["Source", "Target"])  # Optional header
-    writer.writerows(edge_list)
+edge_list.to_csv(
+    data_folder / "output" / f"edge_list{title_narrative_search}.csv",
+    index=False,
+    lineterminator="\r\n",
+)
 
 # network.py
 
@@ -98,10 +97,16 @@ projects_df = projects_df.map(lambda x: list(set(x)) if isinstance(x, list) else
 
 
 # Search for "Afrobarometer" in description_narrative
+mentions_afrobarometer = (
+    projects_df["description_narrative"]
+    .explode()
+    .astype(str)
+    .str.contains("Afrobarometer", regex=False)
+    .groupby(level=0)
+    .any()
+)
 afrobarometer_projects = projects_df[
-    projects_df["description_narrative"].apply(
-        lambda x: "Afrobarometer" in x if isinstance(x, list) else False
-    )
+    mentions_afrobarometer.reindex(projects_df.index, fill_value=False)
 ]
 
 afrobarometer_projects
@@ -13,10 +13,34 @@ import time
 import requests
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 load_dotenv()
 API_KEY = os.getenv("IATI_PRIMARY_KEY")
 
 
+def _load_json(path):
+    with open(path, mode="rb") as file:
+        data = file.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _save_json(all_docs, path):
+    """
+    Write the records as JSON indented by two spaces, encoding with orjson when it
+    is installed; both encoders produce the same bytes.
+    """
+    if orjson:
+        with open(path, mode="wb") as file:
+            file.write(orjson.dumps(all_docs, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, mode="w", encoding="utf-8") as file:
+            json.dump(all_docs, file, ensure_ascii=False, indent=2)
+
+
 def _query_iati_api(query, endpoint):
     valid_endpoints = ["activity", "transaction", "budget"]
     if endpoint in valid_endpoints:
@@ -49,6 +73,9 @@ def _query_iati_api(query, endpoint):
                     all_docs.extend(docs)
                     query["start"] += len(docs)
                     page += 1
+                    # the last page is known from numFound, no empty page needed
+                    if query["start"] >= num_found:
+                        break
                     time.sleep(0.2)  # rate throttling
                 else:
                     break
@@ -83,8 +110,7 @@ def query_transaction_receiver_org_fixed(
         print(
             f"Receiver data for '{transaction_receiver_org_narrative}' already exists. Loading from cache."
         )
-        with open(output_file, mode="r", encoding="utf-8") as file:
-            all_docs = json.load(file)
+        all_docs = _load_json(output_file)
         print(f"Loaded {len(all_docs)} records from cache.")
         return all_docs
 
@@ -96,8 +122,7 @@ def query_transaction_receiver_org_fixed(
         }
         all_docs = _query_iati_api(query, "transaction")
 
-        with open(output_file, mode="w", encoding="utf-8") as file:
-            json.dump(all_docs, file, ensure_ascii=False, indent=4)
+        _save_json(all_docs, output_file)
 
     return all_docs
 
@@ -122,8 +147,7 @@ def query_transaction_receiver_org_fulltext(
         print(
             f"Receiver data for '{transaction_receiver_org_narrative}' already exists. Loading from cache."
         )
-        with open(output_file, mode="r", encoding="utf-8") as file:
-            all_docs = json.load(file)
+        all_docs = _load_json(output_file)
         print(f"Loaded {len(all_docs)} records from cache.")
         return all_docs
 
@@ -137,8 +161,7 @@ def query_transaction_receiver_org_fulltext(
         }
         all_docs = _query_iati_api(query, "transaction")
 
-        with open(output_file, mode="w", encoding="utf-8") as file:
-            json.dump(all_docs, file, ensure_ascii=False, indent=4)
+        _save_json(all_docs, output_file)
 
     return all_docs
 
@@ -167,8 +190,7 @@ def query_transaction_provider_org_fixed(
         print(
             f"Provider Data for '{transaction_provider_org_ref}' already exists. Loading from cache."
         )
-        with open(output_file, mode="r", encoding="utf-8") as file:
-            all_docs = json.load(file)
+        all_docs = _load_json(output_file)
         print(f"Loaded {len(all_docs)} records from cache.")
         return all_docs
 
@@ -180,8 +202,7 @@ def query_transaction_provider_org_fixed(
         }
         all_docs = _query_iati_api(query, "transaction")
 
-        with open(output_file, mode="w", encoding="utf-8") as file:
-            json.dump(all_docs, file, ensure_ascii=False, indent=4)
+        _save_json(all_docs, output_file)
 
     return all_docs
 
@@ -207,8 +228,7 @@ def query_title_narrative_fulltext(
         print(
             f"Fulltext data for title_narrative '{title_narrative}' already exists. Loading from cache."
         )
-        with open(output_file, mode="r", encoding="utf-8") as file:
-            all_docs = json.load(file)
+        all_docs = _load_json(output_file)
         print(f"Loaded {len(all_docs)} records from cache.")
         return all_docs
 
@@ -218,8 +238,7 @@ def query_title_narrative_fulltext(
         query = {"q": f'title_narrative:("{title_narrative}")'}
         all_docs = _query_iati_api(query, endpoint)
 
-        with open(output_file, mode="w", encoding="utf-8") as file:
-            json.dump(all_docs, file, ensure_ascii=False, indent=4)
+        _save_json(all_docs, output_file)
 
     return all_docs
 
@@ -242,8 +261,7 @@ def query_activity_narrative_fulltext(
         print(
             f"Fulltext data for narrative '{narrative}' already exists. Loading from cache."
         )
-        with open(output_file, mode="r", encoding="utf-8") as file:
-            all_docs = json.load(file)
+        all_docs = _load_json(output_file)
         print(f"Loaded {len(all_docs)} records from cache.")
         return all_docs
 
@@ -256,7 +274,6 @@ def query_activity_narrative_fulltext(
         }
         all_docs = _query_iati_api(query, endpoint)
 
-        with open(output_file, mode="w", encoding="utf-8") as file:
-            json.dump(all_docs, file, ensure_ascii=False, indent=4)
+        _save_json(all_docs, output_file)
 
     return all_docs
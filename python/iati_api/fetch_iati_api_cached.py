@@ -1,15 +1,242 @@
+import json
 import os
 import sqlite3
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pandas as pd
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src._utils import TokenBucket
 
 data_folder = Path("data")
 DB_PATH = data_folder / "databases" / "iati.db"
 
+# SQLite's default cap on bound parameters per statement
+SQLITE_MAX_VARIABLES = 999
+
+# pandas dtype kind -> SQLite type for columns added to an existing table
+SQLITE_COLUMN_TYPES = {"i": "INTEGER", "u": "INTEGER", "b": "INTEGER", "f": "REAL"}
+
+SQLITE_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "cache_size=-131072",  # 128 MB page cache
+    "mmap_size=268435456",  # 256 MB memory-mapped I/O
+    "busy_timeout=5000",
+)
+
+
+def _open(db_path: str) -> sqlite3.Connection:
+    """
+    Open the database in autocommit mode with write-friendly PRAGMAs.
+
+    Transactions are started explicitly (BEGIN IMMEDIATE) around each write block.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}")
+    return conn
+
+
+def _table_exists(conn: sqlite3.Connection, table_name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+    ).fetchone()
+    return row is not None
+
+
+def _existing_columns(conn: sqlite3.Connection, table_name: str) -> tuple:
+    """
+    Column names of the table, in table order.
+    """
+    return tuple(row[1] for row in conn.execute(f"PRAGMA table_info({table_name})"))
+
+
+def _ensure_identifier_index(conn: sqlite3.Connection, table_name: str) -> bool:
+    """
+    Index iati_identifier so new-identifier lookups are B-tree probes.
+
+    Tables written before de-duplication may already hold repeated identifiers;
+    those get a plain index instead of a unique one. Returns whether the index is unique.
+    """
+    try:
+        with conn:
+            conn.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table_name}_iati_id "
+                f"ON {table_name}(iati_identifier)"
+            )
+    except sqlite3.IntegrityError:
+        with conn:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table_name}_iati_id "
+                f"ON {table_name}(iati_identifier)"
+            )
+    index_info = conn.execute(f"PRAGMA index_list({table_name})").fetchall()
+    return any(name == f"idx_{table_name}_iati_id" and unique for _, name, unique, *_ in index_info)
+
+
+def _insert_or_ignore(table, conn, keys, data_iter):
+    """
+    pandas to_sql insertion method that lets the unique index skip stored identifiers.
+    """
+    columns = ", ".join(f'"{key}"' for key in keys)
+    placeholders = ", ".join("?" * len(keys))
+    conn.executemany(
+        f'INSERT OR IGNORE INTO "{table.name}" ({columns}) VALUES ({placeholders})',
+        data_iter,
+    )
+    return conn.rowcount
+
+
+def _new_identifiers(conn: sqlite3.Connection, table_name: str, identifiers: pd.Series) -> set:
+    """
+    Return the incoming identifiers that are not yet stored in the table.
+
+    The incoming IDs go into a temporary table and are anti-joined against the
+    indexed table, so the existing identifier column is never loaded into memory.
+    """
+    _ensure_identifier_index(conn, table_name)
+    conn.execute("DROP TABLE IF EXISTS temp._incoming")
+    conn.execute("CREATE TEMP TABLE _incoming(id TEXT PRIMARY KEY)")
+    conn.execute("BEGIN")
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO _incoming VALUES(?)",
+            ((identifier,) for identifier in identifiers),
+        )
+    new_ids = {
+        row[0]
+        for row in conn.execute(
+            f"SELECT i.id FROM _incoming i LEFT JOIN {table_name} a "
+            "ON a.iati_identifier = i.id WHERE a.iati_identifier IS NULL"
+        )
+    }
+    conn.execute("DROP TABLE temp._incoming")
+    return new_ids
+
+
+def _sqlite_type(dtype) -> str:
+    """
+    SQLite column type for a pandas dtype; strings, lists and dates are stored as TEXT.
+    """
+    return SQLITE_COLUMN_TYPES.get(dtype.kind, "TEXT")
+
+
+def _add_columns(conn: sqlite3.Connection, table_name: str, df: pd.DataFrame, columns):
+    """
+    Add the given DataFrame columns to the table in one transaction, typed from their dtypes.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    with conn:
+        for col in columns:
+            sql_type = _sqlite_type(df[col].dtype)
+            default = " DEFAULT ''" if sql_type == "TEXT" else ""
+            conn.execute(f'ALTER TABLE {table_name} ADD COLUMN "{col}" {sql_type}{default};')
+
+
+def _encode_list(value) -> str:
+    """
+    JSON-encode a list value; missing values in a list column become "".
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _stringify_list_columns(df: pd.DataFrame):
+    """
+    Convert list-valued columns to JSON strings in place so SQLite can store them.
+
+    IATI multi-valued fields hold lists throughout, so only object columns are
+    considered and the first non-null value decides for the whole column.
+    """
+    for col in df.columns:
+        series = df[col]
+        if series.dtype != object:
+            continue
+        first_index = series.first_valid_index()
+        if first_index is not None and isinstance(series.loc[first_index], list):
+            df[col] = series.map(_encode_list)
+
+
+def _to_sql_chunked(
+    df: pd.DataFrame,
+    table_name: str,
+    conn: sqlite3.Connection,
+    if_exists: str = "append",
+    method="multi",
+):
+    """
+    Write the DataFrame with multi-row INSERTs inside a single transaction.
+
+    Rows per INSERT are capped so the bound parameters stay within SQLite's limit.
+    The table is created up front so that all inserts share one BEGIN IMMEDIATE.
+    Returns the number of rows written as reported by pandas.
+    """
+    if if_exists == "replace" or not _table_exists(conn, table_name):
+        df.head(0).to_sql(table_name, conn, if_exists=if_exists, index=False)
+
+    chunksize = max(1, SQLITE_MAX_VARIABLES // max(1, len(df.columns)))
+    conn.execute("BEGIN IMMEDIATE")
+    with conn:
+        return df.to_sql(
+            table_name,
+            conn,
+            if_exists="append",
+            index=False,
+            method=method,
+            chunksize=chunksize,
+        )
+
+
+def _sqlite_value(value):
+    # lists and dicts are stored as JSON, as _stringify_list_columns does
+    return json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+
+
+def _insert_records(
+    conn: sqlite3.Connection, table_name: str, records: list, metadata: dict, columns: tuple
+) -> tuple:
+    """
+    Insert API records with one prepared INSERT OR IGNORE, without building a DataFrame.
+
+    `columns` are the table's current columns. Record keys the table does not
+    have yet are added as columns first, typed from their values as in
+    _update_table, and the unique identifier index makes SQLite skip stored
+    identifiers. Returns the number of rows inserted and the updated columns.
+    """
+    known = {col.lower() for col in columns}  # SQLite column names ignore case
+    new_columns = []
+    for record in records:
+        for key in record:
+            if key.lower() not in known and key not in metadata:
+                known.add(key.lower())
+                new_columns.append(key)
+    if new_columns:
+        print(f"New columns to be added: {set(new_columns)}")
+        new_values = pd.DataFrame.from_records(records, columns=new_columns)
+        _stringify_list_columns(new_values)
+        _add_columns(conn, table_name, new_values, new_columns)
+        columns = _existing_columns(conn, table_name)
+
+    column_list = ", ".join(f'"{col}"' for col in columns)
+    placeholders = ", ".join("?" * len(columns))
+    statement = f'INSERT OR IGNORE INTO "{table_name}" ({column_list}) VALUES ({placeholders})'
+    rows = (
+        tuple(_sqlite_value(metadata.get(col, record.get(col))) for col in columns)
+        for record in records
+    )
+    conn.execute("BEGIN IMMEDIATE")
+    with conn:
+        cursor = conn.executemany(statement, rows)
+    return cursor.rowcount, columns
+
 
 # DEPRECATED?
 def _save_to_database(
@@ -23,31 +250,24 @@ def _save_to_database(
     """
 
     # Data Preprocessing: Convert list type columns to string
-    for col in df.columns:
-        if df[col].apply(type).eq(list).any():
-            df[col] = df[col].apply(str)
+    _stringify_list_columns(df)
 
     # Connect to Database
-    conn = sqlite3.connect(db_path)
+    conn = _open(db_path)
     cursor = conn.cursor()
 
-    # get all `iati_identifier` from the existing database
-    try:
-        df_existing = pd.read_sql(f"SELECT iati_identifier FROM {table_name}", conn)
-        print("Data fetched successfully!")
-    except Exception as e:
+    # check whether the table exists yet
+    if not _table_exists(conn, table_name):
         # if the table does not exist yet, create it and exit.
-        # print(f"An error occurred: {e}")
         print(f"Table '{table_name}' does not exist yet. Creating a new table...")
         print(f"Saving {len(df)} new records to the database...")
 
-        df.to_sql(table_name, conn, if_exists="replace", index=False)
+        _to_sql_chunked(df, table_name, conn, if_exists="replace")
         conn.close()
         return  # exit functions
 
     # Step 1: Get the existing columns from the database
-    cursor.execute(f"PRAGMA table_info({table_name});")
-    existing_columns = {col[1] for col in cursor.fetchall()}  # Set of column names
+    existing_columns = set(_existing_columns(conn, table_name))  # Set of column names
 
     # Step 2: Identify new columns that are missing
     new_columns = set(df.columns) - existing_columns
@@ -69,11 +289,12 @@ def _save_to_database(
 
     # Deduplication of activity records: Filter the new data to exclude already existing identifiers
     df.drop_duplicates(subset="iati_identifier", inplace=True)
-    df_new = df[~df["iati_identifier"].isin(df_existing["iati_identifier"])]
+    new_ids = _new_identifiers(conn, table_name, df["iati_identifier"])
+    df_new = df[df["iati_identifier"].isin(new_ids)]
 
     # Append the new data to the database
     print(f"Appending {len(df_new)} new records to the database...")
-    df_new.to_sql(table_name, conn, if_exists="append", index=False)
+    _to_sql_chunked(df_new, table_name, conn)
 
     conn.close()
 
@@ -83,6 +304,7 @@ def update_database(
     db_path: str = DB_PATH,
     table_name: str = "activities",
     add_new_cols=False,
+    conn: sqlite3.Connection = None,
 ):
     """
     Updates the SQLite database table with new data, dynamically adding columns if necessary.
@@ -90,65 +312,71 @@ def update_database(
     Parameters:
     df (pd.DataFrame): The DataFrame containing the data to be saved.
     table_name (str): The name of the table to update in the SQLite database.
+    conn (sqlite3.Connection): Open connection to reuse across calls; db_path is opened if omitted.
     """
 
     # Preprocessing: Convert list type columns to string
-    for col in df.columns:
-        if df[col].apply(type).eq(list).any():
-            df[col] = df[col].apply(str)
+    _stringify_list_columns(df)
 
-    with sqlite3.connect(db_path) as conn:
-        cursor = conn.cursor()
-        # first run initialization
-        # Step 1: Check if table exists and fetch existing identifiers
-        try:
-            df_existing = pd.read_sql(f"SELECT iati_identifier FROM {table_name}", conn)
-            print("Database fetched successfully!")
-        except Exception:
-            # first run innitialization
-            print(f"Table '{table_name}' does not exist yet. Creating a new table...")
-            print(f"Saving {len(df)} new records to the database...")
-            df.to_sql(table_name, conn, if_exists="replace", index=False)
-            return  # Exit function as table is newly created
-
-        # Step 2: Get existing columns
-        cursor.execute(f"PRAGMA table_info({table_name});")
-        existing_columns = {col[1] for col in cursor.fetchall()}
-
-        # Step 3: Identify and add missing columns
-        new_columns = set(df.columns) - existing_columns
-
-        if add_new_cols and new_columns:
-            print(f"New columns to be added: {new_columns}")
-            alter_statements = [
-                f"ALTER TABLE {table_name} ADD COLUMN {col} TEXT DEFAULT '';"
-                for col in new_columns
-            ]
-
-            try:
-                for statement in alter_statements:
-                    cursor.execute(statement)
-            except Exception as e:
-                print(f"An error occured while adding new variables: {e}")
-
-        conn.commit()  # Save changes
-        cursor.close()
-
-        # Step 4: Remove duplicates and filter out existing identifiers
+    if conn is not None:
+        _update_table(df, conn, table_name, add_new_cols)
+    else:
+        with _open(db_path) as conn:
+            _update_table(df, conn, table_name, add_new_cols)
+
+    print("Database update complete.")
+
+
+def _update_table(
+    df: pd.DataFrame, conn: sqlite3.Connection, table_name: str, add_new_cols: bool
+):
+    cursor = conn.cursor()
+    # first run initialization
+    # Step 1: Check if table exists
+    if not _table_exists(conn, table_name):
+        # first run innitialization
+        print(f"Table '{table_name}' does not exist yet. Creating a new table...")
         df.drop_duplicates(subset=["iati_identifier"], inplace=True)
-        df_new = df[~df["iati_identifier"].isin(df_existing["iati_identifier"])]
+        print(f"Saving {len(df)} new records to the database...")
+        _to_sql_chunked(df, table_name, conn, if_exists="replace")
+        _ensure_identifier_index(conn, table_name)
+        return  # Exit function as table is newly created
 
-        if not add_new_cols:
-            df_new = df_new[df_new.columns.intersection(existing_columns)]
+    # Step 2: Get existing columns
+    existing_columns = set(_existing_columns(conn, table_name))
 
-        # Step 5: Append new records
-        if not df_new.empty:
-            print(f"Appending {len(df_new)} new records to the database...")
-            df_new.to_sql(table_name, conn, if_exists="append", index=False)
-        else:
-            print("No new records to append.")
+    # Step 3: Identify and add missing columns
+    new_columns = set(df.columns) - existing_columns
 
-    print("Database update complete.")
+    if add_new_cols and new_columns:
+        print(f"New columns to be added: {new_columns}")
+        try:
+            _add_columns(conn, table_name, df, new_columns)
+            existing_columns |= new_columns
+        except Exception as e:
+            print(f"An error occured while adding new variables: {e}")
+
+    conn.commit()  # Save changes
+
+    # Step 4: Remove duplicates within the batch
+    df.drop_duplicates(subset=["iati_identifier"], inplace=True)
+
+    if not add_new_cols:
+        df = df[df.columns.intersection(existing_columns)]
+
+    # Step 5: Append new records; with a unique index SQLite skips existing
+    # identifiers itself, otherwise they are filtered out first
+    if _ensure_identifier_index(conn, table_name):
+        appended = _to_sql_chunked(df, table_name, conn, method=_insert_or_ignore)
+    else:
+        new_ids = _new_identifiers(conn, table_name, df["iati_identifier"])
+        df_new = df[df["iati_identifier"].isin(new_ids)]
+        appended = _to_sql_chunked(df_new, table_name, conn) if not df_new.empty else 0
+
+    if appended:
+        print(f"Appended {appended} new records to the database.")
+    else:
+        print("No new records to append.")
 
 
 ################################################################################################
@@ -157,9 +385,60 @@ load_dotenv()
 API_KEY = os.getenv("IATI_PRIMARY_KEY")
 BASE_URL = "https://api.iatistandard.org/datastore"
 
+MAX_ROWS = 1000  # datastore maximum per page
+MAX_WORKERS = 5
+REQUESTS_PER_SECOND = 5
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """
+    Return the pooled session shared by all queries, creating it on first use.
+
+    Pages reuse TLS connections, and 429/5xx responses are retried with backoff
+    that honours Retry-After. The session is created lazily so that it picks up
+    a requests_cache.install_cache() call made after this module is imported.
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=10,
+                max_retries=Retry(
+                    total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]
+                ),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Accept-Encoding": "gzip"})
+            _SESSION = session
+        return _SESSION
+
 
 # Main function
-def query_iati_api_cached(query, endpoint: str = "activity", save=True):
+def query_iati_api_cached(
+    query,
+    endpoint: str = "activity",
+    save=True,
+    return_docs=True,
+    conn: sqlite3.Connection = None,
+):
+    """
+    Download all results for a Solr query, writing each page to the database as it arrives.
+
+    Parameters:
+    query (dict): Solr parameters; "q" is required.
+    endpoint (str): One of "activity", "transaction" or "budget".
+    save (bool): Store the results in the activities table.
+    return_docs (bool): Return the downloaded records; pass False to keep only
+        one page in memory and get the number of downloaded records instead.
+    conn (sqlite3.Connection): Open connection to reuse across queries; DB_PATH is
+        opened and closed per call if omitted.
+    """
     valid_endpoints = ["activity", "transaction", "budget"]
     if endpoint in valid_endpoints:
         url = f"{BASE_URL}/{endpoint}/select"
@@ -173,54 +452,109 @@ def query_iati_api_cached(query, endpoint: str = "activity", save=True):
 
     # default params
     query["start"] = 0
-    query["rows"] = 1000  # max rows
+    query["rows"] = MAX_ROWS  # max rows
     query["fl"] = "*"  # all fields
 
-    ## Pagination
-    page = 0
-    data = {}
+    session = _get_session()
+    bucket = TokenBucket(REQUESTS_PER_SECOND)  # rate throttling shared by the page threads
+
+    def fetch_page(start):
+        bucket.acquire()
+        try:
+            response = session.get(
+                url, params={**query, "start": start}, headers=headers, timeout=30
+            )
+        except requests.exceptions.RequestException as e:
+            print("Error:", e)
+            return None
+        if response.status_code != 200:
+            print(f"Error: {response.status_code} - {response.reason}")
+            return None
+        return response.json().get("response", {})
+
+    query_datetime = str(pd.Timestamp.now())  # same text pandas writes for timestamps
+    owns_conn = save and conn is None
+    if owns_conn:
+        conn = _open(DB_PATH)
+    seen_ids = set()  # identifiers already written during this run
+    # table columns as known to this run; refreshed whenever pandas may have
+    # created or altered the table
+    table_columns = {}
+
+    def save_page(docs):
+        docs = [doc for doc in docs if doc.get("iati_identifier") not in seen_ids]
+        if not docs:
+            return
+        seen_ids.update(doc.get("iati_identifier") for doc in docs)
+
+        metadata = {
+            "query_q": query["q"],
+            "url": url,
+            "endpoint": endpoint,
+            "query_datetime": query_datetime,
+        }
+        # an indexed table takes the records directly; creating the table or
+        # handling a legacy table without the unique index goes through pandas.
+        # Both paths add columns for fields that first appear on a later page.
+        if _table_exists(conn, "activities") and _ensure_identifier_index(conn, "activities"):
+            if "activities" not in table_columns:
+                table_columns["activities"] = _existing_columns(conn, "activities")
+            appended, table_columns["activities"] = _insert_records(
+                conn, "activities", docs, metadata, table_columns["activities"]
+            )
+            print(f"Appended {appended} new records to the database.")
+        else:
+            df = pd.DataFrame(docs)
+            for column, value in metadata.items():
+                df[column] = value
+            update_database(df, table_name="activities", add_new_cols=True, conn=conn)
+            table_columns.pop("activities", None)
+
+    ## Pagination: the first page reports numFound, the remaining pages are fetched concurrently
+    num_found = None
+    num_docs = 0
     all_docs = []
+    failed_starts = []  # start offsets of pages that could not be fetched
+
+    def handle_page(page):
+        nonlocal num_docs
+        docs = page.get("docs", [])
+        num_docs += len(docs)
+        if return_docs:
+            all_docs.extend(docs)
+        if save:
+            save_page(docs)
 
     try:
-        while True:
-            response = requests.get(url, params=query, headers=headers)
-
-            if response.status_code == 200:
-                data = response.json()
-
-                # query report on first page
-                if page == 0:
-                    num_found = data.get("response", {}).get("numFound", 0)
-                    print(f"Found a total of {num_found} reccords.")
-                    print("Downloading...")
-
-                docs = data.get("response", {}).get("docs", [])
-                if docs:
-                    all_docs.extend(docs)
-                    query["start"] += len(docs)
-                    page += 1
-                    time.sleep(0.2)  # rate throttling
-                else:
-                    break
-
-            else:
-                print(f"Error: {response.status_code} - {response.reason}")
-                break
-
-    except requests.exceptions.RequestException as e:
-        print("Error:", e)
-
-    print(f"Total of {data.get('response', {}).get('numFound')} results downloaded.")
-
-    df = pd.DataFrame(all_docs)
-
-    if not df.empty and save:
-        df["query_q"] = query["q"]
-        df["url"] = url
-        df["endpoint"] = endpoint
-        df["query_datetime"] = pd.Timestamp.now()
-        update_database(df, table_name="activities")
-    else:
+        first_page = fetch_page(0)
+        if first_page is None:
+            failed_starts.append(0)
+        else:
+            num_found = first_page.get("numFound", 0)
+            print(f"Found a total of {num_found} reccords.")
+            print("Downloading...")
+            handle_page(first_page)
+
+            starts = range(MAX_ROWS, num_found, MAX_ROWS)
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                # map keeps pages in start order
+                for start, page in zip(starts, executor.map(fetch_page, starts)):
+                    if page is None:
+                        failed_starts.append(start)
+                    else:
+                        handle_page(page)
+    finally:
+        if owns_conn:
+            conn.close()
+
+    print(f"Total of {num_docs} results downloaded.")
+    if failed_starts:
+        print(
+            f"Warning: {len(failed_starts)} page(s) failed after retries and are missing "
+            f"(start offsets: {failed_starts}); {num_docs} of {num_found} records downloaded."
+        )
+
+    if not (save and seen_ids):
         print("No changes to the database.")
 
-    return all_docs
+    return all_docs if return_docs else num_docs
@@ -1,3 +1,4 @@
+import argparse
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -5,57 +6,98 @@ import pandas as pd
 import requests_cache
 from dotenv import load_dotenv
 
-from src.iati_api.fetch_iati_api_cached import query_iati_api_cached
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
 
-load_dotenv()
+from src.iati_api.fetch_iati_api_cached import DB_PATH, _open, query_iati_api_cached
 
 ## Setup API cache ##
 data_folder = Path("data")
 db_path = data_folder / "databases" / "api_cache.sqlite"
 
-requests_cache.install_cache(
-    cache_name=str(db_path),
-    backend="sqlite",
-    expire_after=timedelta(weeks=2),
-)
-
-## clear cache
-# session = requests_cache.CachedSession(str(db_path))
-# session.cache.clear()
-
-
 ENDPOINT = "activity"
 
 ### Ref-based queries ###
 ORG_REF = "NO-BRC-977538319"
 
-query = {
-    "q": f'reporting_org_ref:"{ORG_REF}" OR participating_org_ref:"{ORG_REF}" OR transaction_provider_org_ref:"{ORG_REF}"'
-}
-
-
-iati_json_parsed = query_iati_api_cached(query, ENDPOINT)
-df_ref = pd.DataFrame(iati_json_parsed)
-
-current_date = datetime.now().strftime("%Y%m%d")
-df_ref.to_pickle(data_folder / "output" / f"{ORG_REF}_activities_{current_date}.pkl")
-df_ref.to_csv(
-    data_folder / "output" / f"{ORG_REF}_activities_{current_date}.csv", index=False
-)
-
-
 ### Narrative-based queries ###
-
 ORG_NAME = "Norad - Norwegian Agency for Development Cooperation"
 
-query = {
-    "q": f'reporting_org_narrative:"{ORG_NAME}" OR participating_org_narrative:"{ORG_NAME}" OR transaction_provider_org_narrative:"{ORG_NAME}"'
-}
 
-iati_json_narrative = query_iati_api_cached(query, ENDPOINT)
-df_name = pd.DataFrame(iati_json_narrative)
-
-# did not yield any new ones
+def install_api_cache():
+    requests_cache.install_cache(
+        cache_name=str(db_path),
+        backend="sqlite",
+        expire_after=timedelta(weeks=2),
+    )
+
+    ## clear cache
+    # session = requests_cache.CachedSession(str(db_path))
+    # session.cache.clear()
+
+
+def run_for_org(org_ref, conn=None, csv=False):
+    """
+    Download all activities referencing an organization and save them as pickle and Parquet.
+
+    CSV is written instead of Parquet when pyarrow is not installed or cannot
+    convert the columns (e.g. object columns mixing lists and strings), and in
+    addition to it when `csv` is set.
+    """
+    query = {
+        "q": f'reporting_org_ref:"{org_ref}" OR participating_org_ref:"{org_ref}" OR transaction_provider_org_ref:"{org_ref}"'
+    }
+
+    iati_json_parsed = query_iati_api_cached(query, ENDPOINT, conn=conn)
+    df_ref = pd.DataFrame(iati_json_parsed)
+
+    current_date = datetime.now().strftime("%Y%m%d")
+    output_path = data_folder / "output" / f"{org_ref}_activities_{current_date}.pkl"
+    df_ref.to_pickle(output_path, protocol=5)
+    parquet_written = False
+    if pyarrow is not None:
+        parquet_path = output_path.with_suffix(".parquet")
+        try:
+            df_ref.to_parquet(parquet_path, engine="pyarrow", compression="zstd")
+            parquet_written = True
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError) as e:
+            # drop the partial file so a stale Parquet is never read back
+            parquet_path.unlink(missing_ok=True)
+            print(f"Could not write {parquet_path.name} ({e}), writing CSV instead")
+    if csv or not parquet_written:
+        df_ref.to_csv(output_path.with_suffix(".csv"), index=False)
+    return df_ref
+
+
+def run_for_org_name(org_name, conn=None):
+    """
+    Download all activities mentioning an organization name.
+    """
+    query = {
+        "q": f'reporting_org_narrative:"{org_name}" OR participating_org_narrative:"{org_name}" OR transaction_provider_org_narrative:"{org_name}"'
+    }
+
+    iati_json_narrative = query_iati_api_cached(query, ENDPOINT, conn=conn)
+    return pd.DataFrame(iati_json_narrative)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query IATI activities of donor organizations")
+    parser.add_argument("--csv", action="store_true", help="Also write CSV dumps next to the Parquet files")
+    args = parser.parse_args()
+
+    load_dotenv()
+    install_api_cache()
+
+    # one database connection shared by all queries of this run
+    conn = _open(DB_PATH)
+    try:
+        run_for_org(ORG_REF, conn, csv=args.csv)
+        run_for_org_name(ORG_NAME, conn)  # did not yield any new ones
+    finally:
+        conn.close()
 
 
 # "Norwegian Refugee Council"
@@ -100,3 +142,7 @@ df_name = pd.DataFrame(iati_json_narrative)
 #     return all_activities
 
 # all_activities = get_all_activities(organizations, endpoint)
+
+
+if __name__ == "__main__":
+    main()
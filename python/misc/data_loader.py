@@ -0,0 +1,159 @@
+"""Shared loader for organizations-nested.json used by the analysis scripts.
+
+The parsed data is trimmed to the keys the scripts read, memoized per process
+and pickled under python/cache/ so that chained script runs skip the JSON
+parse entirely.
+"""
+
+import hashlib
+import pickle
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+ORGS_PATH = Path('public/data/organizations-nested.json')
+
+# Keys the analysis scripts read; everything else is dropped right after parsing
+ORG_KEYS = ('id', 'name')
+PROJECT_KEYS = ('id',)
+PROJECT_FIELDS = ('Project/Product Name',)
+AGENCY_FIELDS = ('Country Name', 'Agency/Department Name')
+
+# Derived files stay out of public/ (which the site serves); the file name
+# carries a digest of the kept keys so changing them never reuses a stale cache
+CACHE_DIR = Path(__file__).resolve().parent.parent / 'cache'
+KEPT_KEYS_TAG = hashlib.blake2b(
+    repr((ORG_KEYS, PROJECT_KEYS, PROJECT_FIELDS, AGENCY_FIELDS)).encode(), digest_size=6
+).hexdigest()
+ORGS_PICKLE_PATH = CACHE_DIR / f'organizations-nested-{KEPT_KEYS_TAG}.pkl'
+GERMANY_ORGS_PATH = CACHE_DIR / f'organizations-germany-{KEPT_KEYS_TAG}.json'
+
+INTERNED_AGENCY_FIELDS = ('Country Name', 'Agency/Department Name')
+
+
+def _pick(d: Dict, keys: tuple) -> Dict:
+    return {key: d[key] for key in keys if key in d}
+
+
+def _strip_agencies(agencies: List[Dict]) -> List[Dict]:
+    return [{'fields': _pick(agency.get('fields') or {}, AGENCY_FIELDS)} for agency in agencies]
+
+
+def strip_unused_fields(org: Dict) -> Dict:
+    """Keep only the org, project and agency keys the analysis scripts read"""
+    slim = _pick(org, ORG_KEYS)
+    if 'agencies' in org:
+        slim['agencies'] = _strip_agencies(org['agencies'] or [])
+    if 'projects' in org:
+        projects = []
+        for project in org['projects'] or []:
+            slim_project = _pick(project, PROJECT_KEYS)
+            if 'fields' in project:
+                slim_project['fields'] = _pick(project['fields'] or {}, PROJECT_FIELDS)
+            if 'agencies' in project:
+                slim_project['agencies'] = _strip_agencies(project['agencies'] or [])
+            projects.append(slim_project)
+        slim['projects'] = projects
+    return slim
+
+
+def intern_agency_fields(agencies: List[Dict]) -> None:
+    """Intern country and agency names in place so equality checks hit the identity fast path"""
+    for agency in agencies:
+        fields = agency.get('fields')
+        if not fields:
+            continue
+        for key in INTERNED_AGENCY_FIELDS:
+            value = fields.get(key)
+            if isinstance(value, str):
+                fields[key] = sys.intern(value)
+
+
+def intern_org_strings(orgs: List[Dict]) -> None:
+    """Intern agency strings at org and project level"""
+    for org in orgs:
+        intern_agency_fields(org.get('agencies') or [])
+        for project in org.get('projects') or []:
+            intern_agency_fields(project.get('agencies') or [])
+
+
+@lru_cache(maxsize=1)
+def load_orgs() -> List[Dict]:
+    """Load organizations, reusing the pickle cache while it is newer than the JSON"""
+    if ORGS_PICKLE_PATH.exists() and ORGS_PICKLE_PATH.stat().st_mtime >= ORGS_PATH.stat().st_mtime:
+        with open(ORGS_PICKLE_PATH, 'rb') as f:
+            organizations = pickle.load(f)
+        intern_org_strings(organizations)
+        return organizations
+
+    with open(ORGS_PATH, 'rb') as f:
+        organizations = [strip_unused_fields(org) for org in _json.loads(f.read())]
+    intern_org_strings(organizations)
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(ORGS_PICKLE_PATH, 'wb') as f:
+        pickle.dump(organizations, f, protocol=5)
+
+    return organizations
+
+
+def touches_germany(org: Dict) -> bool:
+    """Check if any org- or project-level agency is a Germany agency"""
+    agency_lists = [org.get('agencies') or []]
+    agency_lists.extend(project.get('agencies') or [] for project in org.get('projects') or [])
+    return any(
+        (agency.get('fields') or {}).get('Country Name') == 'Germany'
+        for agencies in agency_lists
+        for agency in agencies
+    )
+
+
+@lru_cache(maxsize=1)
+def load_germany_orgs() -> List[Dict]:
+    """Load only the organizations funded by Germany.
+
+    The subset is cached under python/cache/ and regenerated whenever
+    the full nested file is newer.
+    """
+    if GERMANY_ORGS_PATH.exists() and GERMANY_ORGS_PATH.stat().st_mtime >= ORGS_PATH.stat().st_mtime:
+        with open(GERMANY_ORGS_PATH, 'rb') as f:
+            organizations = _json.loads(f.read())
+        intern_org_strings(organizations)
+        return organizations
+
+    organizations = [org for org in load_orgs() if touches_germany(org)]
+
+    data = _json.dumps(organizations)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(GERMANY_ORGS_PATH, 'wb') as f:
+        f.write(data.encode('utf-8') if isinstance(data, str) else data)
+
+    return organizations
+
+
+def flatten_agencies(orgs: List[Dict]) -> pd.DataFrame:
+    """Flatten org- and project-level agency references into one table.
+
+    Each row holds the org's position in `orgs`, the project's position within
+    the org (-1 for org-level agencies), the agency's country and its name.
+    Country and agency name are categoricals so comparisons run on integer codes.
+    """
+    rows = []
+    for org_idx, org in enumerate(orgs):
+        for agency in org.get('agencies') or []:
+            fields = agency.get('fields') or {}
+            rows.append((org_idx, -1, fields.get('Country Name'), fields.get('Agency/Department Name')))
+        for project_idx, project in enumerate(org.get('projects') or []):
+            for agency in project.get('agencies') or []:
+                fields = agency.get('fields') or {}
+                rows.append((org_idx, project_idx, fields.get('Country Name'), fields.get('Agency/Department Name')))
+    df = pd.DataFrame(rows, columns=['org_idx', 'project_idx', 'country', 'agency_name'])
+    return df.astype({'org_idx': 'int64', 'project_idx': 'int64', 'country': 'category', 'agency_name': 'category'})
@@ -1,12 +1,12 @@
-import json
-from typing import List, Dict, Set, Any
+import sys
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+from typing import List, Dict, Set, FrozenSet, Tuple
 
-# Load the data
-with open('public/data/organizations-nested.json', 'r', encoding='utf-8') as f:
-    organizations = json.load(f)
+from data_loader import load_germany_orgs
 
 # Define the 7 Germany agencies from the UI
-GERMANY_AGENCIES = [
+GERMANY_AGENCIES = frozenset({
     "Federal Foreign Office (FFO)",
     "Unspecified Agency",
     "German Corporation for International Cooperation (GIZ)",
@@ -14,66 +14,66 @@ GERMANY_AGENCIES = [
     "KfW Development Bank (KfW)",
     "Federal Agency for Technical Relief (THW)",
     "Federal Agency for Cartography and Geodesy (BKG)"
-]
+})
 
-print("=" * 100)
-print("DETAILED FILTERING LOGIC ANALYSIS")
-print("=" * 100)
-
-def get_org_level_donors(org: Dict) -> Set[str]:
-    """Get all donor countries from org-level agencies"""
-    donors = set()
-    if 'agencies' in org and org['agencies']:
-        for agency in org['agencies']:
-            country = agency.get('fields', {}).get('Country Name')
-            if country:
-                donors.add(country)
-    return donors
-
-def get_project_level_donors(org: Dict) -> Set[str]:
-    """Get all donor countries from project-level agencies"""
+def scan_agencies(agencies: List[Dict]) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+    """Get donor countries and Germany agency names from one agency list in a single pass"""
     donors = set()
-    if 'projects' in org and org['projects']:
-        for project in org['projects']:
-            if 'agencies' in project and project['agencies']:
-                for agency in project['agencies']:
-                    country = agency.get('fields', {}).get('Country Name')
-                    if country:
-                        donors.add(country)
-    return donors
-
-def get_all_donors(org: Dict) -> Set[str]:
-    """Get all donor countries (org-level + project-level)"""
-    return get_org_level_donors(org) | get_project_level_donors(org)
-
-def get_org_level_germany_agencies(org: Dict) -> List[str]:
-    """Get Germany agency names at org level"""
-    agencies = []
-    if 'agencies' in org and org['agencies']:
-        for agency in org['agencies']:
-            if agency.get('fields', {}).get('Country Name') == 'Germany':
-                agency_name = agency.get('fields', {}).get('Agency/Department Name', '')
-                if agency_name:
-                    agencies.append(agency_name)
-    return agencies
-
-def get_project_level_germany_agencies(project: Dict) -> List[str]:
-    """Get Germany agency names at project level"""
-    agencies = []
-    if 'agencies' in project and project['agencies']:
-        for agency in project['agencies']:
-            if agency.get('fields', {}).get('Country Name') == 'Germany':
-                agency_name = agency.get('fields', {}).get('Agency/Department Name', '')
-                if agency_name:
-                    agencies.append(agency_name)
-    return agencies
-
-def org_has_selected_agency(org: Dict, selected_agencies: List[str]) -> bool:
+    germany_agencies = []
+    for agency in agencies:
+        fields = agency.get('fields')
+        if not fields:
+            continue
+        country = fields.get('Country Name')
+        if country:
+            donors.add(country)
+        if country == 'Germany':
+            agency_name = fields.get('Agency/Department Name', '')
+            if agency_name:
+                germany_agencies.append(agency_name)
+    return frozenset(donors), tuple(germany_agencies)
+
+@dataclass(slots=True)
+class OrgIndex:
+    """Donor countries and Germany agency names precomputed for one organization"""
+    org: Dict
+    projects: List[Dict]
+    org_donors: FrozenSet[str]
+    org_germany_agencies: Tuple[str, ...]
+    project_donors: List[FrozenSet[str]]
+    project_germany_agencies: List[Tuple[str, ...]]
+
+    @property
+    def has_germany(self) -> bool:
+        """Check for Germany among org- or project-level donors, stopping at the first hit"""
+        return 'Germany' in self.org_donors or any('Germany' in donors for donors in self.project_donors)
+
+def precompute(org: Dict) -> OrgIndex:
+    """Walk the org's agencies and projects once, collecting everything the filters need"""
+    projects = org.get('projects') or []
+    org_donors, org_germany_agencies = scan_agencies(org.get('agencies') or [])
+
+    project_donors = []
+    project_germany_agencies = []
+    for project in projects:
+        donors, germany_agencies = scan_agencies(project.get('agencies') or [])
+        project_donors.append(donors)
+        project_germany_agencies.append(germany_agencies)
+
+    return OrgIndex(
+        org=org,
+        projects=projects,
+        org_donors=org_donors,
+        org_germany_agencies=org_germany_agencies,
+        project_donors=project_donors,
+        project_germany_agencies=project_germany_agencies,
+    )
+
+def org_has_selected_agency(rec: OrgIndex, selected_agencies: FrozenSet[str]) -> bool:
     """Check if org has any of the selected agencies at org-level"""
-    org_agencies = get_org_level_germany_agencies(org)
-    return any(agency in selected_agencies for agency in org_agencies)
+    return not selected_agencies.isdisjoint(rec.org_germany_agencies)
 
-def project_matches_agency_filter(project: Dict, selected_agencies: List[str], org_has_agency: bool) -> bool:
+def project_matches_agency_filter(project_agencies: Tuple[str, ...], selected_agencies: FrozenSet[str], org_has_agency: bool) -> bool:
     """
     Simulate the projectMatchesAgencyFilter logic from data.ts
     
@@ -85,158 +85,189 @@ def project_matches_agency_filter(project: Dict, selected_agencies: List[str], o
         return True
     
     # Check project-level agencies
-    project_agencies = get_project_level_germany_agencies(project)
-    return any(agency in selected_agencies for agency in project_agencies)
+    return not selected_agencies.isdisjoint(project_agencies)
 
-# === FILTER 1: Germany alone (no agency filter) ===
-print("\n1. FILTER: Germany alone (no agency filter)")
-print("-" * 100)
+@dataclass(slots=True)
+class FilterStats:
+    """Counters and aggregates behind all five report sections"""
+    germany_only_orgs: int = 0
+    germany_only_projects: int = 0
+    germany_with_agencies_orgs: int = 0
+    germany_with_agencies_projects: int = 0
+    excluded_orgs: List[OrgIndex] = field(default_factory=list)
+    all_germany_agencies: Set[str] = field(default_factory=set)
 
-germany_only_orgs = []
-germany_only_projects = 0
+    def merge(self, other: 'FilterStats') -> None:
+        """Fold the stats of a later chunk of organizations into this one"""
+        self.germany_only_orgs += other.germany_only_orgs
+        self.germany_only_projects += other.germany_only_projects
+        self.germany_with_agencies_orgs += other.germany_with_agencies_orgs
+        self.germany_with_agencies_projects += other.germany_with_agencies_projects
+        self.excluded_orgs.extend(other.excluded_orgs)
+        self.all_germany_agencies.update(other.all_germany_agencies)
 
-for org in organizations:
-    all_donors = get_all_donors(org)
-    
-    # Check if "Germany" is in donors (either org-level or project-level)
-    if 'Germany' in all_donors:
-        germany_only_orgs.append(org)
-        # Count all projects
-        germany_only_projects += len(org.get('projects', []))
+def analyze(orgs: List[Dict], workers: int = 1) -> FilterStats:
+    """Compute every report section in a single pass over the organizations.
 
-print(f"Organizations: {len(germany_only_orgs)}")
-print(f"Total projects: {germany_only_projects}")
+    With workers > 1 the organizations are split into contiguous chunks that a
+    process pool analyzes independently; the partial stats are merged in order.
+    """
+    if workers > 1 and len(orgs) > workers:
+        chunk_size = -(-len(orgs) // workers)
+        chunks = [orgs[i:i + chunk_size] for i in range(0, len(orgs), chunk_size)]
+        with Pool(workers) as pool:
+            partials = pool.map(analyze, chunks)
+        stats = FilterStats()
+        for partial in partials:
+            stats.merge(partial)
+        return stats
 
-# === FILTER 2: Germany + all 7 agencies ===
-print("\n2. FILTER: Germany + all 7 agencies")
-print("-" * 100)
+    stats = FilterStats()
+    for org in orgs:
+        rec = precompute(org)
+        
+        # Unique Germany agency names (org-level + project-level)
+        stats.all_germany_agencies.update(rec.org_germany_agencies)
+        for proj_agencies in rec.project_germany_agencies:
+            stats.all_germany_agencies.update(proj_agencies)
+        
+        # Check if "Germany" is in donors (either org-level or project-level)
+        if not rec.has_germany:
+            continue
+        
+        # Filter 1: Germany alone counts every project
+        stats.germany_only_orgs += 1
+        stats.germany_only_projects += len(rec.projects)
+        
+        # Filter 2: check if org has any of the selected agencies at org-level
+        org_has_agency = org_has_selected_agency(rec, GERMANY_AGENCIES)
+        
+        # Filter projects based on agency filter
+        visible_projects = 0
+        for project_agencies in rec.project_germany_agencies:
+            if project_matches_agency_filter(project_agencies, GERMANY_AGENCIES, org_has_agency):
+                visible_projects += 1
+        
+        # Decide if org should be shown
+        # From data.ts line 818: shouldShowOrg = visibleProjects.length > 0 || (hasAgencyFilter && orgHasSelectedAgency())
+        should_show = visible_projects > 0 or org_has_agency
+        
+        if should_show:
+            stats.germany_with_agencies_orgs += 1
+            stats.germany_with_agencies_projects += visible_projects
+        else:
+            stats.excluded_orgs.append(rec)
+    return stats
 
-germany_with_agencies_orgs = []
-germany_with_agencies_projects = 0
-excluded_orgs = []
+def report(organizations: List[Dict], workers: int = 1) -> None:
+    """Print the Germany agency-filter analysis for the given organizations"""
+    print("=" * 100)
+    print("DETAILED FILTERING LOGIC ANALYSIS")
+    print("=" * 100)
 
-for org in organizations:
-    all_donors = get_all_donors(org)
-    
-    # Check if "Germany" is in donors
-    if 'Germany' not in all_donors:
-        continue
-    
-    # Check if org has any of the selected agencies at org-level
-    org_has_agency = org_has_selected_agency(org, GERMANY_AGENCIES)
-    
-    # Filter projects based on agency filter
-    visible_projects = []
-    for project in org.get('projects', []):
-        if project_matches_agency_filter(project, GERMANY_AGENCIES, org_has_agency):
-            visible_projects.append(project)
-    
-    # Decide if org should be shown
-    # From data.ts line 818: shouldShowOrg = visibleProjects.length > 0 || (hasAgencyFilter && orgHasSelectedAgency())
-    should_show = len(visible_projects) > 0 or org_has_agency
-    
-    if should_show:
-        germany_with_agencies_orgs.append(org)
-        germany_with_agencies_projects += len(visible_projects)
-    else:
-        excluded_orgs.append({
-            'org': org,
-            'org_agencies': get_org_level_germany_agencies(org),
-            'project_count': len(org.get('projects', [])),
-            'projects': org.get('projects', [])
-        })
-
-print(f"Organizations: {len(germany_with_agencies_orgs)}")
-print(f"Total projects: {germany_with_agencies_projects}")
-
-# === DISCREPANCY ANALYSIS ===
-print("\n3. DISCREPANCY")
-print("-" * 100)
-org_diff = len(germany_only_orgs) - len(germany_with_agencies_orgs)
-proj_diff = germany_only_projects - germany_with_agencies_projects
-
-print(f"Organizations excluded: {org_diff}")
-print(f"Projects excluded: {proj_diff}")
-
-# === DETAILED EXCLUSION ANALYSIS ===
-print(f"\n4. ORGANIZATIONS EXCLUDED BY AGENCY FILTER ({len(excluded_orgs)})")
-print("=" * 100)
-
-for item in excluded_orgs:
-    org = item['org']
-    org_name = org.get('name', 'Unknown')
-    org_agencies = item['org_agencies']
-    project_count = item['project_count']
-    projects = item['projects']
-    
-    print(f"\n📌 Organization: {org_name}")
-    print(f"   ID: {org.get('id')}")
-    print(f"   Total projects: {project_count}")
-    print(f"   Org-level Germany agencies: {org_agencies if org_agencies else '[]'}")
-    
-    # Check project-level Germany agencies
-    all_project_germany_agencies = set()
-    for project in projects:
-        proj_agencies = get_project_level_germany_agencies(project)
-        all_project_germany_agencies.update(proj_agencies)
-    
-    if all_project_germany_agencies:
-        print(f"   Project-level Germany agencies found: {list(all_project_germany_agencies)}")
-        # Check which are in the 7 selected
-        matching = [a for a in all_project_germany_agencies if a in GERMANY_AGENCIES]
-        not_matching = [a for a in all_project_germany_agencies if a not in GERMANY_AGENCIES]
-        if matching:
-            print(f"   ✓ Matching selected agencies: {matching}")
-        if not_matching:
-            print(f"   ✗ Non-matching agencies: {not_matching}")
-    else:
-        print(f"   ⚠️  NO Germany agencies at project level!")
-    
-    # Show first few projects
-    if projects:
-        print(f"\n   Projects:")
-        for i, project in enumerate(projects[:3]):
-            proj_name = project.get('fields', {}).get('Project/Product Name', 'Unknown')
-            proj_agencies = get_project_level_germany_agencies(project)
-            print(f"      {i+1}. {proj_name}")
-            if proj_agencies:
-                print(f"         Germany agencies: {proj_agencies}")
-            else:
-                print(f"         No Germany agencies")
-        if len(projects) > 3:
-            print(f"      ... and {len(projects) - 3} more projects")
-
-# === UNIQUE GERMANY AGENCIES ===
-print("\n" + "=" * 100)
-print("5. ALL UNIQUE GERMANY AGENCY NAMES IN ORGANIZATIONS DATA")
-print("=" * 100)
-
-all_germany_agencies = set()
-for org in organizations:
-    # Org-level
-    all_germany_agencies.update(get_org_level_germany_agencies(org))
-    # Project-level
-    for project in org.get('projects', []):
-        all_germany_agencies.update(get_project_level_germany_agencies(project))
-
-print(f"\nFound {len(all_germany_agencies)} unique Germany agency names:")
-for agency_name in sorted(all_germany_agencies):
-    in_list = "✓" if agency_name in GERMANY_AGENCIES else "✗"
-    print(f"  {in_list} {agency_name}")
-
-print("\n" + "=" * 100)
-print("SUMMARY")
-print("=" * 100)
-print(f"• When filtering by 'Germany' alone:")
-print(f"  → {len(germany_only_orgs)} organizations, {germany_only_projects} projects")
-print(f"\n• When filtering by 'Germany + all 7 agencies':")
-print(f"  → {len(germany_with_agencies_orgs)} organizations, {germany_with_agencies_projects} projects")
-print(f"\n• Discrepancy:")
-print(f"  → {org_diff} organization(s) excluded")
-print(f"  → {proj_diff} project(s) excluded")
-print(f"\n• Root cause:")
-print(f"  The agency filter requires organizations to either:")
-print(f"  1. Have at least one of the 7 selected agencies at org-level, OR")
-print(f"  2. Have projects with at least one of the 7 selected agencies at project-level")
-print(f"\n  Organizations funded by Germany but with NONE of the 7 agencies are excluded.")
-print("=" * 100)
+    stats = analyze(organizations, workers)
+
+    # === FILTER 1: Germany alone (no agency filter) ===
+    print("\n1. FILTER: Germany alone (no agency filter)")
+    print("-" * 100)
+
+    print(f"Organizations: {stats.germany_only_orgs}")
+    print(f"Total projects: {stats.germany_only_projects}")
+
+    # === FILTER 2: Germany + all 7 agencies ===
+    print("\n2. FILTER: Germany + all 7 agencies")
+    print("-" * 100)
+
+    print(f"Organizations: {stats.germany_with_agencies_orgs}")
+    print(f"Total projects: {stats.germany_with_agencies_projects}")
+
+    # === DISCREPANCY ANALYSIS ===
+    print("\n3. DISCREPANCY")
+    print("-" * 100)
+    org_diff = stats.germany_only_orgs - stats.germany_with_agencies_orgs
+    proj_diff = stats.germany_only_projects - stats.germany_with_agencies_projects
+
+    print(f"Organizations excluded: {org_diff}")
+    print(f"Projects excluded: {proj_diff}")
+
+    # === DETAILED EXCLUSION ANALYSIS ===
+    print(f"\n4. ORGANIZATIONS EXCLUDED BY AGENCY FILTER ({len(stats.excluded_orgs)})")
+    print("=" * 100)
+
+    # Collect the report lines and emit them with a single write
+    out = []
+    for rec in stats.excluded_orgs:
+        org = rec.org
+        org_name = org.get('name', 'Unknown')
+        org_agencies = list(rec.org_germany_agencies)
+        project_count = len(rec.projects)
+        projects = rec.projects
+        
+        out.append(f"\n📌 Organization: {org_name}")
+        out.append(f"   ID: {org.get('id')}")
+        out.append(f"   Total projects: {project_count}")
+        out.append(f"   Org-level Germany agencies: {org_agencies if org_agencies else '[]'}")
+        
+        # Check project-level Germany agencies
+        all_project_germany_agencies = set()
+        for proj_agencies in rec.project_germany_agencies:
+            all_project_germany_agencies.update(proj_agencies)
+        
+        if all_project_germany_agencies:
+            out.append(f"   Project-level Germany agencies found: {list(all_project_germany_agencies)}")
+            # Check which are in the 7 selected
+            matching = [a for a in all_project_germany_agencies if a in GERMANY_AGENCIES]
+            not_matching = [a for a in all_project_germany_agencies if a not in GERMANY_AGENCIES]
+            if matching:
+                out.append(f"   ✓ Matching selected agencies: {matching}")
+            if not_matching:
+                out.append(f"   ✗ Non-matching agencies: {not_matching}")
+        else:
+            out.append(f"   ⚠️  NO Germany agencies at project level!")
+        
+        # Show first few projects
+        if projects:
+            out.append(f"\n   Projects:")
+            for i, project in enumerate(projects[:3]):
+                proj_name = project.get('fields', {}).get('Project/Product Name', 'Unknown')
+                proj_agencies = rec.project_germany_agencies[i]
+                out.append(f"      {i+1}. {proj_name}")
+                if proj_agencies:
+                    out.append(f"         Germany agencies: {list(proj_agencies)}")
+                else:
+                    out.append(f"         No Germany agencies")
+            if len(projects) > 3:
+                out.append(f"      ... and {len(projects) - 3} more projects")
+
+    sys.stdout.write("\n".join(out) + "\n" if out else "")
+
+    # === UNIQUE GERMANY AGENCIES ===
+    print("\n" + "=" * 100)
+    print("5. ALL UNIQUE GERMANY AGENCY NAMES IN ORGANIZATIONS DATA")
+    print("=" * 100)
+
+    print(f"\nFound {len(stats.all_germany_agencies)} unique Germany agency names:")
+    for agency_name in sorted(stats.all_germany_agencies):
+        in_list = "✓" if agency_name in GERMANY_AGENCIES else "✗"
+        print(f"  {in_list} {agency_name}")
+
+    print("\n" + "=" * 100)
+    print("SUMMARY")
+    print("=" * 100)
+    print(f"• When filtering by 'Germany' alone:")
+    print(f"  → {stats.germany_only_orgs} organizations, {stats.germany_only_projects} projects")
+    print(f"\n• When filtering by 'Germany + all 7 agencies':")
+    print(f"  → {stats.germany_with_agencies_orgs} organizations, {stats.germany_with_agencies_projects} projects")
+    print(f"\n• Discrepancy:")
+    print(f"  → {org_diff} organization(s) excluded")
+    print(f"  → {proj_diff} project(s) excluded")
+    print(f"\n• Root cause:")
+    print(f"  The agency filter requires organizations to either:")
+    print(f"  1. Have at least one of the 7 selected agencies at org-level, OR")
+    print(f"  2. Have projects with at least one of the 7 selected agencies at project-level")
+    print(f"\n  Organizations funded by Germany but with NONE of the 7 agencies are excluded.")
+    print("=" * 100)
+
+if __name__ == "__main__":
+    # Only Germany-funded organizations are relevant here
+    report(load_germany_orgs())
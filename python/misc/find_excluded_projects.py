@@ -1,11 +1,12 @@
-import json
-from typing import List, Dict, Set
+import sys
+from dataclasses import dataclass
+from typing import List, Dict, Tuple
 
-# Load the data
-with open('public/data/organizations-nested.json', 'r', encoding='utf-8') as f:
-    organizations = json.load(f)
+import numpy as np
 
-GERMANY_AGENCIES = [
+from data_loader import flatten_agencies, load_germany_orgs
+
+GERMANY_AGENCIES = frozenset({
     "Federal Foreign Office (FFO)",
     "Unspecified Agency",
     "German Corporation for International Cooperation (GIZ)",
@@ -13,32 +14,18 @@ GERMANY_AGENCIES = [
     "KfW Development Bank (KfW)",
     "Federal Agency for Technical Relief (THW)",
     "Federal Agency for Cartography and Geodesy (BKG)"
-]
-
-def get_all_donors(org: Dict) -> Set[str]:
-    """Get all donor countries (org-level + project-level)"""
-    donors = set()
-    if 'agencies' in org and org['agencies']:
-        for agency in org['agencies']:
-            country = agency.get('fields', {}).get('Country Name')
-            if country:
-                donors.add(country)
-    if 'projects' in org and org['projects']:
-        for project in org['projects']:
-            if 'agencies' in project and project['agencies']:
-                for agency in project['agencies']:
-                    country = agency.get('fields', {}).get('Country Name')
-                    if country:
-                        donors.add(country)
-    return donors
+})
 
 def get_org_level_germany_agencies(org: Dict) -> List[str]:
     """Get Germany agency names at org level"""
     agencies = []
     if 'agencies' in org and org['agencies']:
         for agency in org['agencies']:
-            if agency.get('fields', {}).get('Country Name') == 'Germany':
-                agency_name = agency.get('fields', {}).get('Agency/Department Name', '')
+            fields = agency.get('fields')
+            if not fields:
+                continue
+            if fields.get('Country Name') == 'Germany':
+                agency_name = fields.get('Agency/Department Name', '')
                 if agency_name:
                     agencies.append(agency_name)
     return agencies
@@ -48,103 +35,130 @@ def get_project_level_germany_agencies(project: Dict) -> List[str]:
     agencies = []
     if 'agencies' in project and project['agencies']:
         for agency in project['agencies']:
-            if agency.get('fields', {}).get('Country Name') == 'Germany':
-                agency_name = agency.get('fields', {}).get('Agency/Department Name', '')
+            fields = agency.get('fields')
+            if not fields:
+                continue
+            if fields.get('Country Name') == 'Germany':
+                agency_name = fields.get('Agency/Department Name', '')
                 if agency_name:
                     agencies.append(agency_name)
     return agencies
 
-def org_has_selected_agency(org: Dict) -> bool:
-    """Check if org has any of the selected agencies at org-level"""
-    org_agencies = get_org_level_germany_agencies(org)
-    return any(agency in GERMANY_AGENCIES for agency in org_agencies)
-
-def project_matches_agency_filter(project: Dict, org_has_agency: bool) -> bool:
-    """Check if project matches agency filter"""
-    if org_has_agency:
-        return True
-    project_agencies = get_project_level_germany_agencies(project)
-    return any(agency in GERMANY_AGENCIES for agency in project_agencies)
-
-print("=" * 100)
-print("FINDING EXCLUDED PROJECTS")
-print("=" * 100)
-
-excluded_projects_info = []
-
-for org in organizations:
-    all_donors = get_all_donors(org)
-    
-    if 'Germany' not in all_donors:
-        continue
-    
-    org_has_agency = org_has_selected_agency(org)
-    org_name = org.get('name', 'Unknown')
-    
-    for project in org.get('projects', []):
-        project_name = project.get('fields', {}).get('Project/Product Name', 'Unknown')
-        project_id = project.get('id', 'Unknown')
-        
-        matches_filter = project_matches_agency_filter(project, org_has_agency)
+@dataclass(slots=True)
+class ExcludedProject:
+    """A project hidden by the agency filter, with the context needed to explain why"""
+    org_name: str
+    org_id: str
+    org_has_agency: bool
+    org_germany_agencies: List[str]
+    project_name: str
+    project_id: str
+    project_germany_agencies: List[str]
+    all_project_agencies: List[str]
+
+def report(organizations: List[Dict]) -> None:
+    """Print the projects hidden by the Germany agency filter"""
+    print("=" * 100)
+    print("FINDING EXCLUDED PROJECTS")
+    print("=" * 100)
+
+    # Answer the Germany / agency-filter questions with vectorized masks over a flat agency table
+    agencies_df = flatten_agencies(organizations)
+    org_idx = agencies_df['org_idx'].to_numpy()
+    project_idx = agencies_df['project_idx'].to_numpy()
+    germany_mask = agencies_df['country'].eq('Germany').to_numpy()
+    selected_mask = germany_mask & agencies_df['agency_name'].isin(GERMANY_AGENCIES).to_numpy()
+
+    # Per-org "any row matches" reductions
+    has_germany = np.bincount(org_idx[germany_mask], minlength=len(organizations)) > 0
+    has_selected_agency = np.bincount(org_idx[selected_mask & (project_idx == -1)], minlength=len(organizations)) > 0
+
+    germany_org_idx = np.flatnonzero(has_germany).tolist()
+    projects_with_selected_agency = set(zip(org_idx[selected_mask].tolist(), project_idx[selected_mask].tolist()))
+
+    # Derive each Germany-funded org's filter state once; both reports below reuse it
+    org_filter_state: Dict[int, Tuple[bool, List[str], List[bool]]] = {}
+
+    for idx in germany_org_idx:
+        org = organizations[idx]
+        # If org has the agency at org level, all projects match; otherwise check project-level agencies
+        org_has_agency = bool(has_selected_agency[idx])
+        n_projects = len(org.get('projects') or ())
+        org_filter_state[idx] = (
+            org_has_agency,
+            get_org_level_germany_agencies(org),
+            [org_has_agency or (idx, p) in projects_with_selected_agency for p in range(n_projects)]
+        )
+
+    excluded_projects_info = []
+
+    for idx, (org_has_agency, org_germany_agencies, project_matches) in org_filter_state.items():
+        org = organizations[idx]
+        org_name = org.get('name', 'Unknown')
+        projects = org.get('projects') or ()
         
-        if not matches_filter:
-            proj_agencies = get_project_level_germany_agencies(project)
+        for project, matches_filter in zip(projects, project_matches):
+            project_name = project.get('fields', {}).get('Project/Product Name', 'Unknown')
+            project_id = project.get('id', 'Unknown')
             
-            # Get ALL agencies for this project (not just Germany)
-            all_proj_agencies = []
-            if 'agencies' in project and project['agencies']:
-                for agency in project['agencies']:
-                    country = agency.get('fields', {}).get('Country Name', '?')
-                    agency_name = agency.get('fields', {}).get('Agency/Department Name', '?')
+            if not matches_filter:
+                proj_agencies = get_project_level_germany_agencies(project)
+                
+                # Get ALL agencies for this project (not just Germany)
+                all_proj_agencies = []
+                for agency in project.get('agencies') or ():
+                    fields = agency.get('fields') or {}
+                    country = fields.get('Country Name', '?')
+                    agency_name = fields.get('Agency/Department Name', '?')
                     all_proj_agencies.append(f"{country}: {agency_name}")
-            
-            excluded_projects_info.append({
-                'org_name': org_name,
-                'org_id': org.get('id'),
-                'org_has_agency': org_has_agency,
-                'org_germany_agencies': get_org_level_germany_agencies(org),
-                'project_name': project_name,
-                'project_id': project_id,
-                'project_germany_agencies': proj_agencies,
-                'all_project_agencies': all_proj_agencies
-            })
-
-print(f"\nFound {len(excluded_projects_info)} project(s) excluded by agency filter:\n")
-
-for i, info in enumerate(excluded_projects_info, 1):
-    print(f"{i}. Project: {info['project_name']}")
-    print(f"   Project ID: {info['project_id']}")
-    print(f"   Organization: {info['org_name']}")
-    print(f"   Organization ID: {info['org_id']}")
-    print(f"   Org has selected agency at org-level: {info['org_has_agency']}")
-    print(f"   Org-level Germany agencies: {info['org_germany_agencies']}")
-    print(f"   Project-level Germany agencies: {info['project_germany_agencies']}")
-    if not info['project_germany_agencies']:
-        print(f"   ⚠️  This project has NO Germany agencies!")
-    print(f"   All project agencies: {info['all_project_agencies']}")
-    print()
-
-# Let's also check how many projects each org with Germany has
-print("=" * 100)
-print("PROJECT COUNTS BY ORGANIZATION (Germany donors)")
-print("=" * 100)
-
-for org in organizations:
-    all_donors = get_all_donors(org)
-    
-    if 'Germany' not in all_donors:
-        continue
-    
-    org_name = org.get('name', 'Unknown')
-    total_projects = len(org.get('projects', []))
-    
-    org_has_agency = org_has_selected_agency(org)
-    visible_projects = sum(1 for p in org.get('projects', []) 
-                          if project_matches_agency_filter(p, org_has_agency))
-    
-    if visible_projects < total_projects:
-        print(f"\n{org_name}:")
-        print(f"  Total projects: {total_projects}")
-        print(f"  Visible with agency filter: {visible_projects}")
-        print(f"  Excluded: {total_projects - visible_projects}")
-        print(f"  Org-level Germany agencies: {get_org_level_germany_agencies(org)}")
+                
+                excluded_projects_info.append(ExcludedProject(
+                    org_name=org_name,
+                    org_id=org.get('id'),
+                    org_has_agency=org_has_agency,
+                    org_germany_agencies=org_germany_agencies,
+                    project_name=project_name,
+                    project_id=project_id,
+                    project_germany_agencies=proj_agencies,
+                    all_project_agencies=all_proj_agencies
+                ))
+
+    print(f"\nFound {len(excluded_projects_info)} project(s) excluded by agency filter:\n")
+
+    # Collect the report lines and emit them with a single write
+    out = []
+    for i, info in enumerate(excluded_projects_info, 1):
+        out.append(f"{i}. Project: {info.project_name}")
+        out.append(f"   Project ID: {info.project_id}")
+        out.append(f"   Organization: {info.org_name}")
+        out.append(f"   Organization ID: {info.org_id}")
+        out.append(f"   Org has selected agency at org-level: {info.org_has_agency}")
+        out.append(f"   Org-level Germany agencies: {info.org_germany_agencies}")
+        out.append(f"   Project-level Germany agencies: {info.project_germany_agencies}")
+        if not info.project_germany_agencies:
+            out.append(f"   ⚠️  This project has NO Germany agencies!")
+        out.append(f"   All project agencies: {info.all_project_agencies}")
+        out.append("")
+
+    sys.stdout.write("\n".join(out) + "\n" if out else "")
+
+    # Let's also check how many projects each org with Germany has
+    print("=" * 100)
+    print("PROJECT COUNTS BY ORGANIZATION (Germany donors)")
+    print("=" * 100)
+
+    for idx, (_, org_germany_agencies, project_matches) in org_filter_state.items():
+        org_name = organizations[idx].get('name', 'Unknown')
+        total_projects = len(project_matches)
+        visible_projects = sum(project_matches)
+        
+        if visible_projects < total_projects:
+            print(f"\n{org_name}:")
+            print(f"  Total projects: {total_projects}")
+            print(f"  Visible with agency filter: {visible_projects}")
+            print(f"  Excluded: {total_projects - visible_projects}")
+            print(f"  Org-level Germany agencies: {org_germany_agencies}")
+
+if __name__ == "__main__":
+    # Only Germany-funded organizations are relevant here
+    report(load_germany_orgs())
@@ -0,0 +1,38 @@
+"""Run the Germany agency-filter reports against a single load of the data.
+
+Usage (from the project root):
+    python python/misc/run_reports.py [detailed-filter] [excluded-projects] [--workers N]
+    (default: run all reports in a single process)
+"""
+
+import argparse
+
+import detailed_filter_analysis
+import find_excluded_projects
+from data_loader import load_germany_orgs
+
+REPORTS = {
+    'detailed-filter': lambda orgs, args: detailed_filter_analysis.report(orgs, workers=args.workers),
+    'excluded-projects': lambda orgs, args: find_excluded_projects.report(orgs),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Germany agency-filter reports")
+    parser.add_argument('reports', nargs='*', metavar='report', help=f"One of {', '.join(REPORTS)} (default: all)")
+    parser.add_argument('--workers', type=int, default=1, help="Processes for the per-organization analysis (default: 1)")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.reports if name not in REPORTS]
+    if unknown:
+        parser.error(f"unknown report(s): {', '.join(unknown)}")
+
+    # Load and pre-filter once; every report reuses the same organizations list
+    organizations = load_germany_orgs()
+
+    for name in args.reports or REPORTS:
+        REPORTS[name](organizations, args)
+
+
+if __name__ == "__main__":
+    main()